@@ -3,8 +3,8 @@ from dash import html, dcc
 from dash.dependencies import Input, Output, State
 import base64
 import os
-from layouts import create_hittrax_analysis_tab
-from callbacks import register_hittrax_callbacks, register_leaderboard_callbacks
+from layouts import create_hittrax_analysis_tab, create_sync_status_bar, create_sync_log_tab
+from callbacks import register_hittrax_callbacks, register_leaderboard_callbacks, register_sync_status_callbacks
 from leaderboard_layout import create_leaderboard_layout
 from db_utils import DatabaseManager  # Updated import
 from config import HITTRAX_CONFIG
@@ -23,16 +23,10 @@ def verify_database():
         # Test data retrieval
         try:
             print("\nTesting data retrieval...")
-            df = get_hittrax_data()
-            if not df.empty:
-                print(f"Successfully retrieved {len(df)} records")
-                print("Sample columns:", list(df.columns)[:5])
-                
-                # Test stats calculation
-                stats_df = calculate_player_stats(df, min_ab=10)
-                print(f"\nCalculated stats for {len(stats_df)} players with 10+ at-bats")
-                if not stats_df.empty:
-                    print("Sample player stats columns:", list(stats_df.columns))
+            stats_df = DatabaseManager.get_player_stats(min_ab=10)
+            if not stats_df.empty:
+                print(f"Retrieved stats for {len(stats_df)} players with 10+ at-bats")
+                print("Sample player stats columns:", list(stats_df.columns))
             else:
                 print("Warning: No data retrieved from database")
         except Exception as e:
@@ -55,6 +49,7 @@ app = dash.Dash(
 
 app.layout = html.Div([
     html.H1("Baseball Analysis Dashboard", style={'textAlign': 'center'}),
+    create_sync_status_bar(),
     
     dcc.Tabs([
         dcc.Tab(label='HitTrax Analysis', children=[
@@ -63,6 +58,10 @@ app.layout = html.Div([
         
         dcc.Tab(label='Leaderboards', children=[
             create_leaderboard_layout()
+        ]),
+        
+        dcc.Tab(label='Sync Status', children=[
+            create_sync_log_tab()
         ])
     ])
 ])
@@ -70,6 +69,7 @@ app.layout = html.Div([
 # Register callbacks
 app = register_hittrax_callbacks(app)
 app = register_leaderboard_callbacks(app)
+app = register_sync_status_callbacks(app)
 
 if __name__ == '__main__':
     print("Starting the dashboard... Open http://127.0.0.1:8050/ in your web browser")
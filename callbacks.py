@@ -7,7 +7,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from dash import dash_table
 import pandas as pd
-from db_utils import DatabaseManager, COLUMN_FORMATS, COLUMN_GROUPS  # Updated import
+from db_utils import DatabaseManager, COLUMN_FORMATS, COLUMN_GROUPS, PLAYER_DETAIL_COLUMNS, frame_records  # Updated import
 from leaderboard_utils import get_leaderboard_data
 from leaderboard_layout import create_player_card
 from export_utils import create_leaderboard_pdf, create_social_media_image
@@ -30,36 +30,22 @@ def register_hittrax_callbacks(app):
     )
     def update_hittrax_data(selected_years, selected_players, min_ab, selected_columns):
         try:
-            # Get data and calculate summaries using DatabaseManager class methods
-            df = DatabaseManager.get_hittrax_data()
-            if df.empty:
-                raise ValueError("No data available in local database")
-            
-            # Debug prints
-            print("Initial columns:", df.columns.tolist())
-            
-            stats_df = DatabaseManager.calculate_player_stats(df, min_ab or 10)
+            # Per-player summaries come pre-aggregated from the PlayerDaily rollup;
+            # the unfiltered set feeds the filter options
+            stats_df = DatabaseManager.get_player_stats(min_ab or 10, aggregates=['AB'])
             if stats_df.empty:
                 raise ValueError("No qualified players found")
             
-            print("Stats columns:", stats_df.columns.tolist())
-            
-            # Initialize display_data
-            display_data = stats_df.copy()
-            
-            # Apply filters
-            if selected_years:
-                display_data = display_data[display_data['GraduationYear'].isin(selected_years)]
-            if selected_players:
-                display_data = display_data[display_data['Name'].isin(selected_players)]
+            # Every COLUMN_FORMATS column, with the filters applied in the query
+            display_data = DatabaseManager.get_player_stats(min_ab or 10, grad_years=selected_years,
+                                                            players=selected_players)
 
             if display_data.empty:
                 empty_fig = px.scatter(title="No data available for selected filters")
                 player_options = [{'label': name, 'value': name} 
                                 for name in sorted(stats_df['Name'].unique())]
-                grad_year_options = [{'label': str(int(year)), 'value': year} 
-                                   for year in sorted(stats_df['GraduationYear'].unique()) 
-                                   if pd.notna(year)]
+                grad_year_options = [{'label': str(int(year)), 'value': int(year)} 
+                                   for year in sorted(stats_df['GraduationYear'].dropna().unique())]
                 return [], [], [], empty_fig, empty_fig, empty_fig, player_options, grad_year_options
 
             # Create scatter plot
@@ -126,12 +112,13 @@ def register_hittrax_callbacks(app):
             # Update filter options
             player_options = [{'label': name, 'value': name}
                             for name in sorted(stats_df['Name'].unique())]
-            grad_year_options = [{'label': str(int(year)), 'value': year}
-                           for year in sorted(stats_df['GraduationYear'].unique()) 
-                           if pd.notna(year)]
+            grad_year_options = [{'label': str(int(year)), 'value': int(year)}
+                           for year in sorted(stats_df['GraduationYear'].dropna().unique())]
 
+            # Row ids are the UserIds, so a click resolves to the right player
+            # however the table is sorted or filtered
             return (
-                display_data.to_dict('records'),
+                frame_records(display_data.assign(id=display_data['UserId'])),
                 columns,
                 tooltip_data,
                 scatter_fig,
@@ -148,6 +135,53 @@ def register_hittrax_callbacks(app):
             empty_fig = px.scatter(title=f"Error: {str(e)}")
             return [], [], [], empty_fig, empty_fig, empty_fig, [], []
 
+    @app.callback(
+        [Output('summary-view', 'style'),
+         Output('session-details-view', 'style'),
+         Output('player-name-header', 'children'),
+         Output('session-details-table', 'data'),
+         Output('session-details-table', 'columns'),
+         Output('session-trend-graph', 'figure'),
+         Output('hittrax-summary-table', 'selected_rows')],
+        [Input('hittrax-summary-table', 'selected_row_ids'),
+         Input('return-to-summary', 'n_clicks')]
+    )
+    def show_player_details(selected_row_ids, back_clicks):
+        summary = ({'display': 'block'}, {'display': 'none'}, '', [], [], px.line(), dash.no_update)
+        triggered = callback_context.triggered[0]['prop_id'] if callback_context.triggered else ''
+        if triggered.startswith('return-to-summary'):
+            return summary[:-1] + ([],)
+        if not selected_row_ids:
+            return summary
+
+        try:
+            details = DatabaseManager.get_player_details(selected_row_ids[0], columns=PLAYER_DETAIL_COLUMNS)
+            if details.empty:
+                raise ValueError(f"No sessions found for player {selected_row_ids[0]}")
+
+            trend_fig = px.line(
+                details.sort_values('TimeStamp'),
+                x='TimeStamp',
+                y=['MaxExitVelMph', 'AvgExitVelMph'],
+                markers=True,
+                title='Exit Velocity by Session'
+            )
+            columns = [{'name': col, 'id': col} for col in details.columns]
+
+            return (
+                {'display': 'none'},
+                {'display': 'block'},
+                details['Name'].iloc[0],
+                frame_records(details),
+                columns,
+                trend_fig,
+                dash.no_update
+            )
+
+        except Exception as e:
+            print(f"Error showing player details: {str(e)}")
+            return summary
+
     return app
 
 def register_leaderboard_callbacks(app):
@@ -288,4 +322,64 @@ def register_leaderboard_callbacks(app):
                 str(max_dist_year or '2025'), 
                 str(avg_dist_year or '2025'))
 
-    return app
\ No newline at end of file
+    return app
+
+def register_sync_status_callbacks(app):
+    @app.callback(
+        Output('sync-status', 'children'),
+        [Input('sync-status-interval', 'n_intervals')]
+    )
+    def update_sync_status(n_intervals):
+        status = DatabaseManager.get_sync_status()
+        if not status:
+            return "Sync service has not run yet"
+
+        text = f"Sync: {status['Status']} · last checked {status['LastChecked'] or 'never'}"
+        if status['LastSyncFinished']:
+            text += (f" · last sync {status['LastSyncFinished']} "
+                     f"({status['LastSyncSeconds']:.1f}s, {int(status['LastSyncRows'] or 0):,} rows)")
+        if status['Status'] in ('error', 'unreachable') and status['LastError']:
+            text += f" · {status['LastError']}"
+        return text
+
+    @app.callback(
+        [Output('sync-throughput-graph', 'figure'),
+         Output('sync-log-table', 'data')],
+        [Input('sync-status-interval', 'n_intervals')]
+    )
+    def update_sync_log(n_intervals):
+        log = DatabaseManager.get_sync_log()
+        if log.empty:
+            return go.Figure(layout={'title': 'No sync runs logged yet'}), []
+
+        # Only successful runs with rows say anything about throughput
+        trend = log[log['Error'].isna() & (log['Rows'] > 0)].sort_values('Id')
+        fig = px.line(
+            trend,
+            x='StartedAt',
+            y='RowsPerSec',
+            color='TableName',
+            line_dash='Mode',
+            markers=True,
+            title='Sync Throughput by Table',
+            labels={'StartedAt': 'Run', 'RowsPerSec': 'Rows / second', 'TableName': 'Table'}
+        )
+        return fig, log.fillna('').to_dict('records')
+
+    @app.callback(
+        Output('connection-pool-stats', 'children'),
+        [Input('sync-status-interval', 'n_intervals')]
+    )
+    def update_connection_pool_stats(n_intervals):
+        stats = DatabaseManager.get_connection_stats()
+        if stats['hit_rate'] is None:
+            return "Read connections: none used yet"
+        text = (f"Read connections: {stats['open']} open · {stats['opened']:,} opened, "
+                f"{stats['reused']:,} reused ({stats['hit_rate']:.1%} reuse)")
+        cache = DatabaseManager.get_cache_stats()
+        if cache['hit_rate'] is not None:
+            text += (f" · Query cache: {cache['entries']} results, {cache['bytes'] / 1e6:.1f} MB, "
+                     f"{cache['hit_rate']:.1%} hits")
+        return text
+
+    return app
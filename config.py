@@ -14,4 +14,25 @@ HITTRAX_CONFIG = {
         'meters_to_feet': 3.28084,
         'mps_to_mph': 2.23694  # meters per second to miles per hour
     }
-}
\ No newline at end of file
+}
+# Read-only connections the dashboard reuses per thread (connection_pool.py)
+READ_POOL_CONFIG = {
+    # Bytes of the database file memory-mapped by each connection
+    'mmap_size': 268435456,
+    # Page cache per connection (KiB); kept across requests since connections are reused
+    'cache_kib': 65536,
+    # Wait this long for a sync's checkpoint instead of failing a read
+    'busy_timeout_ms': 5000
+}
+
+# Memoized dashboard query results (query_cache.py)
+QUERY_CACHE_CONFIG = {
+    # Approximate memory the cached results may use before the least recently used are dropped
+    'max_bytes': 268435456
+}
+
+# DataFrames loaded for the dashboard (db_utils.compact_frame)
+DATAFRAME_CONFIG = {
+    # Arrow-backed columns instead of NumPy ones; needs pyarrow, ignored without it
+    'arrow': False
+}
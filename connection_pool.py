@@ -0,0 +1,119 @@
+# connection_pool.py
+import sqlite3
+import threading
+from pathlib import Path
+from config import HITTRAX_CONFIG, READ_POOL_CONFIG
+
+class ReadConnectionPool:
+    """
+    Long-lived, read-only connections, one per thread
+
+    Each thread keeps its own connection (sqlite3 connections must not be
+    used by two threads at once), so the page cache and memory map survive
+    between requests. A thread without one first adopts the connection of a
+    thread that has exited; the Dash development server runs every request
+    on a new thread. Connections open in read-only URI mode with the
+    READ_POOL_CONFIG pragmas. WAL is set on the file by db/schema.py, so
+    reads never block a sync, and outside a transaction every query sees the
+    latest committed data.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # thread ident -> [connection, database path, last PRAGMA data_version seen]
+        self._connections = {}
+        self.opened = 0
+        self.reused = 0
+        self._generation = 0
+
+    def _open(self, path):
+        # as_uri() percent-encodes characters such as ?, # and % in the path
+        conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={int(READ_POOL_CONFIG['mmap_size'])}")
+        conn.execute(f"PRAGMA cache_size=-{int(READ_POOL_CONFIG['cache_kib'])}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={int(READ_POOL_CONFIG['busy_timeout_ms'])}")
+        return conn
+
+    def _adopt(self, path):
+        """Take over a connection left behind by a finished thread, closing any for another path"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        me = threading.get_ident()
+        adopted, stale = None, []
+        with self._lock:
+            for ident, entry in list(self._connections.items()):
+                # An entry under our own ident belongs to a dead thread whose ident was recycled
+                if ident in alive and ident != me:
+                    continue
+                del self._connections[ident]
+                if entry[1] == path and adopted is None:
+                    adopted = entry
+                else:
+                    stale.append(entry[0])
+            if adopted is not None:
+                self._connections[me] = adopted
+        for conn in stale:
+            conn.close()
+        return adopted[0] if adopted else None
+
+    def get(self):
+        """Return this thread's connection, reusing one where possible"""
+        path = HITTRAX_CONFIG['sqlite_db']
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.path != path:
+            conn = self._adopt(path)
+            if conn is None:
+                conn = self._open(path)
+                with self._lock:
+                    self.opened += 1
+                    self._connections[threading.get_ident()] = [conn, path, None]
+                self._local.conn, self._local.path = conn, path
+                return conn
+            self._local.conn, self._local.path = conn, path
+        with self._lock:
+            self.reused += 1
+        return conn
+
+    def close_all(self):
+        """Close every pooled connection, e.g. before replacing the database file"""
+        with self._lock:
+            connections = [entry[0] for entry in self._connections.values()]
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def generation(self, conn):
+        """
+        A counter that moves whenever the database may have changed
+
+        conn is this thread's connection from get(). Its PRAGMA data_version
+        changes when any other connection commits; a connection checked for
+        the first time counts as a change too. Costs one pragma, no disk reads.
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            entry = self._connections.get(threading.get_ident())
+            if entry is None or entry[2] != version:
+                self._generation += 1
+                if entry is not None:
+                    entry[2] = version
+            return self._generation
+
+    def stats(self):
+        """Connections opened and reused so far, and the share of requests served by reuse"""
+        with self._lock:
+            requests = self.opened + self.reused
+            return {
+                'open': len(self._connections),
+                'opened': self.opened,
+                'reused': self.reused,
+                'hit_rate': self.reused / requests if requests else None
+            }
+
+read_pool = ReadConnectionPool()
+
+def get_read_connection():
+    """This thread's pooled read-only connection to the local database; don't close it"""
+    return read_pool.get()
@@ -0,0 +1,132 @@
+# archive.py
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+from config import HITTRAX_CONFIG, DB_CONFIG
+from schema import (PARTITIONED_TABLES, TABLES, create_indexes, create_partition_views, create_sqlite_schema,
+                    partition_name, table_partitions)
+
+def archive_path(table, season, directory=None):
+    return os.path.join(directory or DB_CONFIG['archive_dir'], f"{partition_name(table, season)}.db")
+
+def archive_season(table='Plays', season=None, directory=None):
+    """
+    Move the oldest season of a partitioned table into its own database file
+
+    The partition is copied into a standalone SQLite file, then dropped from
+    the local database and recorded in PartitionArchive, so syncs and
+    reconciles stop pulling that season from the source. Only the oldest
+    season can go, and never the last one left. Returns the archive path.
+    """
+    create_sqlite_schema()
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+
+    try:
+        partitions = table_partitions(conn, table)
+        oldest = next(iter(partitions), None)
+        season = season or oldest
+        if season != oldest:
+            raise ValueError(f"Only the oldest {table} season ({oldest}) can be archived")
+        if len(partitions) < 2:
+            raise ValueError(f"{table} has a single season left; nothing to archive")
+
+        path = archive_path(table, season, directory)
+        if os.path.exists(path):
+            raise FileExistsError(f"{path} already exists")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        print(f"Archiving {table} season {season} to {path}...")
+
+        name = partitions[season]
+        # ATTACH is not allowed inside a transaction
+        conn.execute("ATTACH DATABASE ? AS archive", (path,))
+        conn.execute('BEGIN')
+        conn.execute(TABLES[table].format(name=f"archive.{name}"))
+        conn.execute(f"INSERT INTO archive.{name} SELECT * FROM {name}")
+        rows = conn.execute(f"SELECT COUNT(*) FROM archive.{name}").fetchone()[0]
+        conn.commit()
+        conn.execute("DETACH DATABASE archive")
+
+        conn.execute('BEGIN')
+        conn.execute(f"DROP TABLE {name}")
+        create_partition_views(conn)
+        conn.execute(
+            "INSERT INTO PartitionArchive (TableName, Season, Path, Rows, ArchivedAt) VALUES (?, ?, ?, ?, ?)",
+            (table, season, os.path.abspath(path), rows, datetime.now().isoformat(' ', 'seconds'))
+        )
+        conn.commit()
+
+        print(f"Archived {rows:,} rows")
+        return path
+
+    except Exception as e:
+        print(f"Error archiving {table} season {season}: {str(e)}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def restore_season(table='Plays'):
+    """
+    Bring the most recently archived season of a table back into the local database
+
+    Archived seasons are restored newest first so the archived ones always
+    stay a contiguous run of the oldest seasons. Returns the restored season.
+    """
+    create_sqlite_schema()
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+
+    try:
+        row = conn.execute(
+            "SELECT Season, Path FROM PartitionArchive WHERE TableName = ? ORDER BY Season DESC LIMIT 1", (table,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"No archived {table} seasons")
+        season, path = row
+        print(f"Restoring {table} season {season} from {path}...")
+
+        name = partition_name(table, season)
+        conn.execute("ATTACH DATABASE ? AS archive", (path,))
+        conn.execute('BEGIN')
+        conn.execute(TABLES[table].format(name=name))
+        conn.execute(f"INSERT INTO {name} SELECT * FROM archive.{name}")
+        create_indexes(conn, table)
+        create_partition_views(conn)
+        conn.execute("DELETE FROM PartitionArchive WHERE TableName = ? AND Season = ?", (table, season))
+        conn.commit()
+        conn.execute("DETACH DATABASE archive")
+
+        print(f"Restored {table} season {season}; the archive file at {path} can be removed")
+        return season
+
+    except Exception as e:
+        print(f"Error restoring {table}: {str(e)}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old seasons of partitioned tables out of the local database")
+    parser.add_argument('action', choices=['archive', 'restore', 'list'])
+    parser.add_argument('--table', choices=list(PARTITIONED_TABLES), default='Plays')
+    parser.add_argument('--season', type=int, default=None,
+                        help="Season to archive (default: the oldest one)")
+    parser.add_argument('--dir', default=None, help="Archive directory (default: DB_CONFIG['archive_dir'])")
+    args = parser.parse_args()
+
+    if args.action == 'archive':
+        archive_season(args.table, args.season, args.dir)
+    elif args.action == 'restore':
+        restore_season(args.table)
+    else:
+        create_sqlite_schema()
+        conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+        for season, name in table_partitions(conn, args.table).items():
+            count = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            print(f"{season}  {count:>10,} rows  local")
+        for season, path, rows in conn.execute(
+            "SELECT Season, Path, Rows FROM PartitionArchive WHERE TableName = ? ORDER BY Season", (args.table,)
+        ):
+            print(f"{season}  {rows:>10,} rows  {path}")
+        conn.close()
@@ -0,0 +1,101 @@
+# benchmark.py
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import fake_source
+from config import HITTRAX_CONFIG, DB_CONFIG
+from generate_data import append_activity, edit_history
+from reconcile import reconcile_all
+from snapshot import export_snapshot, import_snapshot
+from sync import sync_all
+from sync_utils import print_sync_report
+
+MODES = ['full', 'parallel', 'incremental', 'parallel_incremental', 'reconcile', 'snapshot']
+
+def remove_database(path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def run_benchmark(source, modes=None, workdir=None, latency_ms=0, new_sessions=500, new_plays=20000):
+    """
+    Time each sync mode against a generated source database
+
+    The source is copied into workdir first, because the incremental and
+    reconcile steps append and edit rows, and the local database is written
+    there too, so the real hittrax_local.db is never touched. Incremental
+    modes run after new_sessions / new_plays are added; reconcile runs after
+    random edits and deletes. Returns a list of (mode, seconds, rows).
+    """
+    modes = modes or MODES
+    workdir = workdir or tempfile.mkdtemp(prefix='hittrax-bench-')
+    os.makedirs(workdir, exist_ok=True)
+
+    bench_source = os.path.join(workdir, 'benchmark_source.db')
+    shutil.copyfile(source, bench_source)
+    DB_CONFIG['fake_source'] = bench_source
+    HITTRAX_CONFIG['sqlite_db'] = os.path.join(workdir, 'benchmark_local.db')
+    fake_source.ROUND_TRIP_SECONDS = latency_ms / 1000
+    remove_database(HITTRAX_CONFIG['sqlite_db'])
+    print(f"Benchmarking {', '.join(modes)} in {workdir} (latency {latency_ms} ms)...")
+
+    results = []
+    for mode in modes:
+        if mode in ('full', 'parallel'):
+            remove_database(HITTRAX_CONFIG['sqlite_db'])
+        elif not os.path.exists(HITTRAX_CONFIG['sqlite_db']):
+            # Every other mode needs a loaded local database to start from
+            sync_all(raise_errors=True)
+
+        if mode in ('incremental', 'parallel_incremental'):
+            append_activity(bench_source, new_sessions, new_plays)
+        elif mode == 'reconcile':
+            # Freshly synced, so every partition must match; one that doesn't
+            # would be re-pulled by every reconcile
+            drift = {table: keys for table, keys in reconcile_all(dry_run=True).items() if keys}
+            if drift:
+                raise RuntimeError(f"Synced database differs from the source in partitions {drift}")
+            edit_history(bench_source)
+
+        started = time.perf_counter()
+        if mode in ('full', 'parallel', 'incremental', 'parallel_incremental'):
+            counts = sync_all(incremental='incremental' in mode, parallel=mode.startswith('parallel'),
+                              raise_errors=True)
+            rows = sum(counts.values())
+        elif mode == 'reconcile':
+            reconcile_all()
+            rows = None
+        else:
+            snapshot_dir = os.path.join(workdir, 'snapshot')
+            export_snapshot(snapshot_dir)
+            results.append(('snapshot_export', time.perf_counter() - started, None))
+            remove_database(HITTRAX_CONFIG['sqlite_db'])
+            started = time.perf_counter()
+            rows = sum(import_snapshot(snapshot_dir).values())
+            mode = 'snapshot_import'
+        results.append((mode, time.perf_counter() - started, rows))
+
+    print(f"\n{'Mode':<22} {'Seconds':>10} {'Rows':>12} {'Rows/s':>12}")
+    for mode, seconds, rows in results:
+        count = f"{rows:,}" if rows is not None else ''
+        rate = f"{rows / seconds:,.0f}" if rows else ''
+        print(f"{mode:<22} {seconds:>10.2f} {count:>12} {rate:>12}")
+    print_sync_report(limit=3 * len(results) + 3)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every sync mode against a generated source")
+    parser.add_argument('source', help="Source database built by generate_data.py")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=None)
+    parser.add_argument('--workdir', default=None, help="Directory for the scratch copies (default: a temp dir)")
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help="Simulated round trip added to every source execute and fetch")
+    parser.add_argument('--new-sessions', type=int, default=500,
+                        help="Sessions added before each incremental run")
+    parser.add_argument('--new-plays', type=int, default=20000,
+                        help="Plays added before each incremental run")
+    args = parser.parse_args()
+
+    run_benchmark(args.source, args.modes, args.workdir, args.latency_ms, args.new_sessions, args.new_plays)
@@ -1,3 +1,5 @@
+import os
+
 HITTRAX_CONFIG = {
     'source_db': {
         'server': '192.168.113.172',
@@ -14,4 +16,40 @@ HITTRAX_CONFIG = {
         'meters_to_feet': 3.28084,
         'mps_to_mph': 2.23694  # meters per second to miles per hour
     }
-}
\ No newline at end of file
+}
+
+DB_CONFIG = {
+    # Sync service: seconds between source probes, and the longest gap
+    # allowed between syncs even when the probes show no change
+    'poll_interval': 300,
+    'sync_interval': 86400,
+    # Rows fetched from SQL Server and inserted into SQLite per round trip
+    'batch_size': 5000,
+    # Upserts larger than this load without secondary indexes and rebuild them after
+    'defer_index_threshold': 50000,
+    # SQLite page cache (KiB) for the sync connection, sized for index rebuilds
+    'sync_cache_kib': 262144,
+    # Concurrent source connections used by parallel sync
+    'sync_workers': 4,
+    # Incremental syncs re-pull rows this many days behind the stored
+    # TimeStamp watermark so late edits (e.g. Active flips) are picked up
+    'incremental_lookback_days': 3,
+    # Plays Id block size compared per partition by reconcile.py
+    'reconcile_block_size': 50000,
+    # Rows per compressed chunk file written by snapshot.py export
+    'snapshot_rows_per_file': 250000,
+    # Post-sync maintenance (maintenance.py): run after every sync_all,
+    # vacuum once this share of the file is free pages, and run the full
+    # integrity check every so many days
+    'maintenance_after_sync': True,
+    'vacuum_freelist_ratio': 0.1,
+    'integrity_check_days': 7,
+    # Directory for season databases moved out of the local database by archive.py
+    'archive_dir': 'archive',
+    # Keep each session's plays as packed column arrays in PlayArrays as well
+    # (play_arrays.py), for loading them straight into NumPy
+    'play_arrays': False,
+    # Path to a local stand-in for the HitTrax SQL Server built by
+    # generate_data.py; when set, every sync reads from it instead
+    'fake_source': os.environ.get('HITTRAX_FAKE_SOURCE')
+}
@@ -0,0 +1,91 @@
+# fake_source.py
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+# Simulated network round trip (seconds) added to every execute and fetch,
+# so benchmarks against a local file behave more like the facility link
+ROUND_TRIP_SECONDS = 0.0
+
+# The few T-SQL constructs our queries use that SQLite spells differently
+TSQL_REWRITES = [
+    (re.compile(r'CONVERT\(\s*date\s*,\s*(\w+)\s*\)', re.I), r'date(\1)'),
+    (re.compile(r'GETDATE\(\)', re.I), "datetime('now', 'localtime')"),
+]
+
+# pymssql returns DATETIME columns as datetime objects, not text
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+def translate(sql):
+    """Rewrite a pymssql-style T-SQL statement for SQLite"""
+    sql = sql.replace('%s', '?')
+    for pattern, replacement in TSQL_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+class Cursor:
+    """The subset of the pymssql cursor API used by the sync code"""
+
+    def __init__(self, cursor, as_dict=False):
+        self._cursor = cursor
+        self._as_dict = as_dict
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        if ROUND_TRIP_SECONDS:
+            time.sleep(ROUND_TRIP_SECONDS)
+        if params is not None and not isinstance(params, (tuple, list, dict)):
+            params = (params,)
+        self._cursor.execute(translate(sql), params or ())
+        self.description = self._cursor.description
+        self.rowcount = self._cursor.rowcount
+
+    def _rows(self, rows):
+        if self._as_dict:
+            columns = [col[0] for col in self.description]
+            return [dict(zip(columns, row)) for row in rows]
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return self._rows([row])[0] if row is not None else None
+
+    def fetchmany(self, size=1):
+        if ROUND_TRIP_SECONDS:
+            time.sleep(ROUND_TRIP_SECONDS)
+        return self._rows(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+class Connection:
+    """A pymssql-compatible connection backed by a local SQLite file"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+
+    def cursor(self, as_dict=False):
+        return Cursor(self._conn.cursor(), as_dict)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+def connect(path, **kwargs):
+    """
+    Stand-in for pymssql.connect that opens a generated source database
+
+    Server credentials in kwargs are accepted and ignored, so callers can
+    pass HITTRAX_CONFIG['source_db'] unchanged.
+    """
+    return Connection(path)
@@ -0,0 +1,267 @@
+# generate_data.py
+import argparse
+import math
+import os
+import random
+import re
+import sqlite3
+from array import array
+from datetime import datetime, timedelta
+from schema import TABLES
+from sync import SYNC_QUERIES
+
+FIRST_NAMES = ['Aaron', 'Aiden', 'Brady', 'Brody', 'Caleb', 'Carter', 'Chase', 'Cole', 'Colton', 'Dean',
+               'Drew', 'Dylan', 'Ethan', 'Gavin', 'Hunter', 'Jace', 'Jake', 'Kaiden', 'Landon', 'Logan',
+               'Luke', 'Maddox', 'Mason', 'Matthew', 'Noah', 'Owen', 'Ryan', 'Ty', 'Tyler', 'Wyatt']
+LAST_NAMES = ['Armstrong', 'Baca', 'Chavez', 'Cook', 'Eaton', 'Ellison', 'Flores', 'Garcia', 'Gonzales',
+              'Jaramillo', 'Jones', 'Lopez', 'Martinez', 'Montoya', 'Moya', 'Rivera', 'Romero', 'Sanchez',
+              'Segura', 'Smith', 'Tinker', 'Trujillo', 'Vigil', 'Worthen']
+SCHOOLS = ['Cibola', 'Eldorado', 'La Cueva', 'Sandia', 'Volcano Vista', 'Rio Rancho', 'Cleveland', 'Manzano']
+
+GRAVITY = 9.81
+HOME_RUN_METERS = 110
+
+# Source tables are opened with PARSE_DECLTYPES; store timestamps in the
+# same text format the converter in fake_source.py reads back
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+def query_columns(table):
+    """The exact column list sync.py selects from a source table"""
+    select = re.search(r'SELECT\s+(.*?)\s+FROM', SYNC_QUERIES[table], re.S).group(1)
+    return [column.strip() for column in select.split(',')]
+
+def source_ddl(table):
+    """CREATE TABLE for the stand-in, typed from the local schema"""
+    types = dict(re.findall(r'^\s*(\w+)\s+(INTEGER|REAL|TEXT|TIMESTAMP)', TABLES[table], re.M))
+    columns = query_columns(table)
+    definitions = [f"{column} {types[column]}" + (' PRIMARY KEY' if column == 'Id' else '') for column in columns]
+    return f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})"
+
+def as_real(row):
+    """
+    Round a row's floats to float32, as stored in the HitTrax `real` columns
+
+    pymssql hands those back widened to Python floats, so the stand-in
+    holds exactly the values a sync from the real server would.
+    """
+    return [array('f', [value])[0] if type(value) is float else value for value in row]
+
+def insert_sql(table):
+    columns = query_columns(table)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+def player_power(user_id):
+    """A player's typical exit velocity (m/s), stable across generator runs"""
+    return random.Random(user_id).uniform(24, 40)
+
+def make_user(user_id, rng, created):
+    """One player; about a fifth have the placeholder GraduationYear of 1 like the real data"""
+    grad_year = rng.randint(2024, 2033)
+    birth = datetime(grad_year - 18, rng.randint(1, 12), rng.randint(1, 28))
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        'Id': user_id, 'UnitId': 1, 'FirstName': first, 'LastName': last,
+        'UserName': f"{first.lower()}.{last.lower()}{user_id}", 'Password': '',
+        'Created': created, 'Email': f"{first.lower()}{user_id}@example.com" if rng.random() < 0.7 else None,
+        'Stadium': rng.randint(0, 5), 'SkillLevel': rng.randint(1, 5), 'GameType': rng.randint(0, 3),
+        'Height': round(rng.gauss(1.75, 0.1), 3), 'Role': 0, 'Active': 1 if rng.random() < 0.95 else 0,
+        'Weight': round(rng.gauss(70, 10), 2), 'Position': rng.randint(1, 9), 'Bats': rng.randint(0, 1),
+        'Throws': rng.randint(0, 1), 'School': rng.choice(SCHOOLS), 'HomeTown': 'Albuquerque',
+        'GraduationYear': 1 if rng.random() < 0.2 else grad_year, 'Gender': 0, 'BirthDate': birth,
+        # Not a source column
+        '_power': player_power(user_id)
+    }
+
+def make_play(play_id, session_id, timestamp, power, rng):
+    """One swing; distance follows a dragged projectile from exit velocity and launch angle"""
+    exit_velo = max(5.0, rng.gauss(power, 4))
+    elevation = rng.gauss(12, 16)
+    carry = exit_velo ** 2 * math.sin(math.radians(2 * max(elevation, 0))) / GRAVITY * 0.55
+    distance = max(carry, rng.uniform(5, 40)) if elevation > 0 else rng.uniform(5, 40)
+    horizontal = rng.uniform(-45, 45)
+    result = 0 if rng.random() < 0.35 else rng.randint(1, 8)
+    return {
+        'Id': play_id, 'SessionId': session_id, 'TimeStamp': timestamp,
+        'ExitBallVel1': exit_velo * math.cos(math.radians(elevation)), 'ExitBallVel2': rng.uniform(-5, 5),
+        'ExitBallVel3': exit_velo * math.sin(math.radians(elevation)), 'Distance': distance,
+        'PitchVel': rng.gauss(25, 3), 'Result': result, 'Type': rng.randint(0, 3),
+        'Fielder': rng.randint(0, 9), 'Quadrant': rng.randint(0, 3),
+        **{f"Pos{kind}{axis}": rng.uniform(-2, 2) for kind in ('Start', 'End', 'Pitch', 'Caught') for axis in (1, 2, 3)},
+        'PitchType': rng.randint(0, 4), **{f"PitchCoeffs{i}": rng.uniform(-1, 1) for i in range(1, 7)},
+        'PitchBreakH': rng.uniform(-0.5, 0.5), 'PitchBreakV': rng.uniform(-0.5, 0.5), 'Elevation': elevation,
+        'PitchBreakVG': rng.uniform(-0.5, 0.5), 'Ms': rng.randint(0, 999),
+        'GroundDist': distance * rng.uniform(0.8, 1.0), 'Active': 1 if rng.random() < 0.98 else 0,
+        'Intersect1': rng.uniform(-1, 1), 'Intersect2': rng.uniform(0, 2), 'Intersect3': rng.uniform(-1, 1),
+        'PitchAngle': rng.uniform(-10, 0), 'HorizontalAngle': horizontal, 'ExitVelo': exit_velo,
+        'Points': rng.randint(0, 100)
+    }
+
+def make_session(session_id, user, timestamp, plays, rng):
+    """A session whose aggregates are computed from its plays, as HitTrax does"""
+    hits = [play for play in plays if play['Result'] > 0]
+    singles = sum(1 for play in hits if play['Distance'] < 60)
+    home_runs = sum(1 for play in hits if play['Distance'] >= HOME_RUN_METERS)
+    doubles = sum(1 for play in hits if 60 <= play['Distance'] < 90)
+    triples = len(hits) - singles - doubles - home_runs
+    at_bats = len(plays)
+    exit_velos = [play['ExitVelo'] for play in plays] or [0.0]
+    distances = [play['Distance'] for play in plays] or [0.0]
+    ground = [play['GroundDist'] for play in plays] or [0.0]
+    hard_hit = [velo for velo in exit_velos if velo >= 42]
+    percentages = ['LDPercentage', 'FBPercentage', 'GBPercentage', 'LIPercentage', 'RIPercentage',
+                   'CIPercentage', 'LOPercentage', 'ROPercentage', 'COPercentage']
+    return {
+        'Id': session_id, 'UnitId': 1, 'UserId': user['Id'], 'UserUnitId': 1, 'TimeStamp': timestamp,
+        'Stadium': user['Stadium'], 'Type': rng.randint(0, 3), 'SkillLevel': user['SkillLevel'],
+        'GameType': user['GameType'],
+        'MaxPitchVel': max((play['PitchVel'] for play in plays), default=0.0),
+        'MaxExitVel': max(exit_velos), 'AvgPitchVel': sum(play['PitchVel'] for play in plays) / max(at_bats, 1),
+        'AvgExitVel': sum(exit_velos) / len(exit_velos),
+        'AvgElevation': sum(play['Elevation'] for play in plays) / max(at_bats, 1),
+        'AvgDistance': sum(distances) / len(distances), 'MaxDistance': max(distances),
+        'PitchCount': at_bats, 'HitCount': len(hits), 'Singles': singles, 'Doubles': doubles,
+        'Triples': triples, 'HomeRuns': home_runs, 'FoulBalls': rng.randint(0, 5),
+        'Strikes': rng.randint(0, 10), 'Balls': rng.randint(0, 10),
+        'AVG': len(hits) / at_bats if at_bats else 0.0,
+        'SLG': (singles + 2 * doubles + 3 * triples + 4 * home_runs) / at_bats if at_bats else 0.0,
+        **{name: rng.uniform(0, 100) for name in percentages},
+        'StrikeZoneBottom': 0.5, 'StrikeZoneTop': 1.1, 'HHCount': len(hard_hit),
+        'HHVel': sum(hard_hit) / len(hard_hit) if hard_hit else 0.0,
+        'Active': 1 if rng.random() < 0.95 else 0, 'StrikeZoneWidth': 0.43,
+        'MaxGroundDist': max(ground), 'AvgGroundDist': sum(ground) / len(ground),
+        'Score': rng.randint(0, 1000), 'MaxPoints': rng.randint(0, 100), 'AB': at_bats, 'Video': 0,
+        'RankMaxVel': rng.random(), 'RankAvgVel': rng.random(), 'RankMaxDist': rng.random(),
+        'RankPoints': rng.random(), 'BatMaterial': rng.randint(0, 2)
+    }
+
+def load_users(conn):
+    """Read back the player fields sessions need from an existing source"""
+    return [
+        {'Id': user_id, 'Stadium': stadium, 'SkillLevel': skill, 'GameType': game_type,
+         '_power': player_power(user_id)}
+        for user_id, stadium, skill, game_type in conn.execute("SELECT Id, Stadium, SkillLevel, GameType FROM Users")
+    ]
+
+def add_sessions(conn, users, sessions, plays, start, end, rng, batch_size=5000):
+    """
+    Append sessions and their plays with Ids and timestamps after the existing ones
+
+    Players get a long-tailed share of sessions, sessions fall in afternoon
+    and evening hours between start and end, and play counts vary around
+    plays / sessions. Returns (sessions, plays) written.
+    """
+    session_id = (conn.execute("SELECT MAX(Id) FROM Session").fetchone()[0] or 0) + 1
+    play_id = (conn.execute("SELECT MAX(Id) FROM Plays").fetchone()[0] or 0) + 1
+    weights = [rng.paretovariate(1.5) for _ in users]
+    per_session = plays / sessions if sessions else 0
+    session_columns, play_columns = query_columns('Session'), query_columns('Plays')
+    session_sql, play_sql = insert_sql('Session'), insert_sql('Plays')
+
+    # Sorted start times keep Id and TimeStamp increasing together, which
+    # the incremental watermarks rely on
+    days = max((end - start).days, 1)
+    starts = sorted(rng.random() for _ in range(sessions))
+
+    session_rows, play_rows = [], []
+    written_plays = 0
+    for i, fraction in enumerate(starts):
+        day, time_of_day = divmod(fraction * days, 1)
+        timestamp = (start.replace(hour=14, minute=0, second=0, microsecond=0)
+                     + timedelta(days=int(day), seconds=int(time_of_day * 7 * 3600)))
+        user = rng.choices(users, weights)[0]
+        remaining_sessions = sessions - i
+        count = max(0, round(rng.uniform(0.5, 1.5) * per_session))
+        if remaining_sessions == 1:
+            count = max(0, plays - written_plays)
+        count = min(count, plays - written_plays)
+
+        session_plays = [
+            make_play(play_id + n, session_id, timestamp + timedelta(seconds=20 * n), user['_power'], rng)
+            for n in range(count)
+        ]
+        session = make_session(session_id, user, timestamp, session_plays, rng)
+        session_rows.append(as_real([session[c] for c in session_columns]))
+        play_rows.extend(as_real([play[c] for c in play_columns]) for play in session_plays)
+        session_id += 1
+        play_id += count
+        written_plays += count
+
+        if len(play_rows) >= batch_size or len(session_rows) >= batch_size:
+            conn.executemany(session_sql, session_rows)
+            conn.executemany(play_sql, play_rows)
+            session_rows, play_rows = [], []
+
+    conn.executemany(session_sql, session_rows)
+    conn.executemany(play_sql, play_rows)
+    return sessions, written_plays
+
+def generate_source(path, users=5000, sessions=500000, plays=20000000, start=None, end=None, seed=1):
+    """
+    Build a stand-in HitTrax source database at path
+
+    Tables have exactly the columns sync.py selects. Point
+    DB_CONFIG['fake_source'] (or HITTRAX_FAKE_SOURCE) at the file to sync
+    from it. An existing file is replaced.
+    """
+    end = end or datetime.now().replace(microsecond=0)
+    start = start or end - timedelta(days=3 * 365)
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+
+    print(f"Generating {users:,} users, {sessions:,} sessions and {plays:,} plays in {path}...")
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        for table in ('Users', 'Session', 'Plays'):
+            conn.execute(source_ddl(table))
+
+        user_columns = query_columns('Users')
+        players = [make_user(user_id, rng, start) for user_id in range(1, users + 1)]
+        conn.executemany(insert_sql('Users'), (as_real([user[c] for c in user_columns]) for user in players))
+        add_sessions(conn, players, sessions, plays, start, end, rng)
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_session_timestamp ON Session(TimeStamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_plays_timestamp ON Plays(TimeStamp)")
+        conn.commit()
+    finally:
+        conn.close()
+    print("Source database generated!")
+
+def append_activity(path, sessions, plays, days=1, seed=None):
+    """Add new sessions and plays over the last few days, as a day of facility use would"""
+    conn = sqlite3.connect(path)
+    try:
+        rng = random.Random(seed)
+        last = conn.execute("SELECT MAX(TimeStamp) FROM Session").fetchone()[0]
+        start = datetime.fromisoformat(last) + timedelta(seconds=1) if last else datetime.now() - timedelta(days=days)
+        written = add_sessions(conn, load_users(conn), sessions, plays, start, start + timedelta(days=days), rng)
+        conn.commit()
+        return written
+    finally:
+        conn.close()
+
+def edit_history(path, updates=1000, deletes=100, seed=None):
+    """Flip Active on random older plays and delete a few, like late corrections on the HitTrax machine"""
+    conn = sqlite3.connect(path)
+    try:
+        rng = random.Random(seed)
+        max_id = conn.execute("SELECT MAX(Id) FROM Plays").fetchone()[0] or 0
+        conn.executemany("UPDATE Plays SET Active = 1 - Active WHERE Id = ?",
+                         [(rng.randint(1, max_id),) for _ in range(updates)])
+        conn.executemany("DELETE FROM Plays WHERE Id = ?", [(rng.randint(1, max_id),) for _ in range(deletes)])
+        conn.commit()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic HitTrax source database")
+    parser.add_argument('path', help="SQLite file to create")
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--sessions', type=int, default=500000)
+    parser.add_argument('--plays', type=int, default=20000000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    generate_source(args.path, args.users, args.sessions, args.plays, seed=args.seed)
@@ -0,0 +1,90 @@
+# grad_years.py
+
+# Graduation years for players whose HitTrax profile is missing or wrong,
+# by full name. Copied into GradYearOverride for the matching accounts once
+# (see seed_grad_year_overrides); after that the table is the place to add,
+# change or delete overrides.
+SEEDED_OVERRIDES = {
+    'Brody Armstrong': 2029,
+    'Colton Floyd': 2027,
+    'Maddox Gonzales': 2027,
+    'Kaiden Nerhood': 2026,
+    'Wyatt Tinker': 2026,
+    'Dean Ellison': 2026,
+    'Aiden Mobley': 2026,
+    'Everett Burdett': 2026,
+    'Luke Feist': 2026,
+    'Chase Qualler': 2026,
+    'Edward Blanshine': 2026,
+    'Damon Saavedra': 2026,
+    'Abram Pine': 2026,
+    'Noah Segura': 2026,
+    'Hunter Easton': 2026,
+    'Chris Moya': 2026,
+    'Nathaniel Jaramillo': 2026,
+    'Mark Scime': 2027,
+    'Deegan Goldberg': 2026,
+    'Ty Rector': 2026,
+    'Avery Dearholt': 2026,
+    'Landyn Cottone': 2027,
+    'Caiden House': 2027,
+    'Tas Lupo': 2027,
+    'Logan Sunstrom': 2027,
+    'Brayden Bustillos': 2027,
+    'Chase Rivera': 2027,
+    'Matthew Cook': 2027,
+    'Richie Reiffenberger': 2028,
+    'Brayden Palmerton': 2028,
+    'Drew Jones': 2029,
+    'James Tabbert': 2029,
+    'Gavin Eaton': 2029,
+    'Tyler Worthen': 2029,
+    'Calin Rivera': 2029,
+    'Aiden Koester': 2030,
+    'Aaron Flores': 2030,
+    'Adam Jimenez': 2023,
+    'Jace Gabaldon': 2028,
+    'Radley Philipbar': 2028
+}
+
+# Override first, then the profile's GraduationYear (1 means unset), then
+# the birth date: born September or later graduates at 18, otherwise at 17
+EFFECTIVE_GRAD_YEAR = """
+    COALESCE(
+        (SELECT o.GradYear FROM GradYearOverride o WHERE o.UserId = Users.Id),
+        NULLIF(GraduationYear, 1),
+        CASE
+            WHEN strftime('%m', BirthDate) >= '09'
+            THEN CAST(strftime('%Y', BirthDate) AS INTEGER) + 18
+            ELSE CAST(strftime('%Y', BirthDate) AS INTEGER) + 17
+        END
+    )
+"""
+
+def seed_grad_year_overrides(conn, apply=True):
+    """
+    Copy each SEEDED_OVERRIDES entry into GradYearOverride once
+
+    A name is recorded in GradYearSeeded the first time it matches an
+    account, and is never seeded again, so an override deleted on purpose
+    stays deleted. apply=False only records the names, for databases whose
+    overrides were seeded before GradYearSeeded existed.
+    """
+    names = [(name,) for name in SEEDED_OVERRIDES]
+    if apply:
+        conn.executemany(
+            """INSERT OR IGNORE INTO GradYearOverride (UserId, GradYear)
+               SELECT Id, ? FROM Users WHERE FullName = ? AND FullName NOT IN (SELECT FullName FROM GradYearSeeded)""",
+            [(year, name) for name, year in SEEDED_OVERRIDES.items()]
+        )
+    conn.executemany(
+        "INSERT OR IGNORE INTO GradYearSeeded (FullName) SELECT DISTINCT FullName FROM Users WHERE FullName = ?",
+        names
+    )
+
+def refresh_grad_years(conn):
+    """Resolve Users.EffectiveGradYear for every account, in the caller's transaction"""
+    conn.execute(f"""
+        UPDATE Users SET EffectiveGradYear = {EFFECTIVE_GRAD_YEAR}
+        WHERE EffectiveGradYear IS NOT {EFFECTIVE_GRAD_YEAR}
+    """)
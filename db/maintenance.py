@@ -0,0 +1,131 @@
+# maintenance.py
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from config import HITTRAX_CONFIG, DB_CONFIG
+from schema import MAINTENANCE_LOG_TABLE, TABLES, storage_tables
+from sync_utils import new_run_id
+
+# auto_vacuum modes reported by PRAGMA auto_vacuum
+AUTO_VACUUM_INCREMENTAL = 2
+
+def refresh_statistics(conn, force=False):
+    """
+    Keep sqlite_stat1 current for the planner
+
+    Non-empty synced tables without statistics (first sync, or stats lost
+    with a rebuilt table) are analyzed outright. PRAGMA optimize then
+    re-analyzes any table whose row count has drifted since its last
+    ANALYZE; 0x10002 makes it look at every table, not only the ones this
+    connection has queried.
+    """
+    has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    analyzed = {row[0] for row in conn.execute("SELECT DISTINCT tbl FROM sqlite_stat1")} if has_stats else set()
+    storages = [storage for table in TABLES for storage in storage_tables(conn, table)]
+    missing = [storage for storage in storages
+               if (force or storage not in analyzed) and conn.execute(f"SELECT 1 FROM {storage} LIMIT 1").fetchone()]
+
+    conn.execute('PRAGMA analysis_limit=1000')
+    for storage in missing:
+        conn.execute(f'ANALYZE {storage}')
+    conn.execute('PRAGMA optimize=0x10002')
+    return f"analyzed {', '.join(missing)}; optimize" if missing else "optimize"
+
+def reclaim_free_pages(conn, force=False):
+    """
+    Return free pages to the file system once they pass vacuum_freelist_ratio
+
+    The first time, the database is switched to auto_vacuum=INCREMENTAL,
+    which takes one full VACUUM; after that PRAGMA incremental_vacuum
+    releases the free pages without rewriting the rest of the file.
+    """
+    pages = conn.execute('PRAGMA page_count').fetchone()[0]
+    free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    ratio = free / pages if pages else 0.0
+    if not force and ratio < DB_CONFIG['vacuum_freelist_ratio']:
+        return f"{free:,} of {pages:,} pages free ({ratio:.0%}), skipped"
+
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+        action = 'VACUUM (switched to incremental auto_vacuum)'
+    else:
+        # Frees one page per step; execute() stops after the first page,
+        # executescript() steps the statement to completion
+        conn.executescript('PRAGMA incremental_vacuum')
+        action = 'incremental_vacuum'
+    # Keep the WAL from holding a second copy of the rewritten pages
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    after = conn.execute('PRAGMA page_count').fetchone()[0]
+    return f"{action}: {pages:,} -> {after:,} pages ({free:,} were free)"
+
+def integrity_check_due(conn):
+    """True when no integrity check has succeeded within integrity_check_days"""
+    last = conn.execute(
+        "SELECT MAX(StartedAt) FROM MaintenanceLog WHERE Step = 'integrity_check' AND Error IS NULL"
+    ).fetchone()[0]
+    return last is None or datetime.fromisoformat(last) < datetime.now() - timedelta(days=DB_CONFIG['integrity_check_days'])
+
+def check_integrity(conn):
+    """Run PRAGMA integrity_check; problems are raised so the step is logged as failed"""
+    problems = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+    if problems != ['ok']:
+        raise sqlite3.DatabaseError(f"integrity_check found {len(problems)} problems: {'; '.join(problems[:5])}")
+    return 'ok'
+
+def run_maintenance(run_id=None, force_analyze=False, force_vacuum=False, force_integrity=False, verbose=True):
+    """
+    Run the post-sync maintenance steps and log each one in MaintenanceLog
+
+    Statistics are refreshed every time, free pages are reclaimed past the
+    configured threshold and the integrity check runs on its schedule. A
+    failing step is logged and reported but doesn't stop the others or fail
+    the sync. Returns {step: (seconds, detail, error)}.
+    """
+    run_id = run_id or new_run_id()
+    # Autocommit: VACUUM and the auto_vacuum switch can't run in a transaction
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'], isolation_level=None)
+    results = {}
+
+    try:
+        conn.execute(MAINTENANCE_LOG_TABLE)
+        steps = [
+            ('analyze', lambda: refresh_statistics(conn, force_analyze)),
+            ('vacuum', lambda: reclaim_free_pages(conn, force_vacuum)),
+        ]
+        if force_integrity or integrity_check_due(conn):
+            steps.append(('integrity_check', lambda: check_integrity(conn)))
+
+        for step, run in steps:
+            started_at = datetime.now()
+            started = time.perf_counter()
+            detail, error = None, None
+            try:
+                detail = run()
+            except Exception as e:
+                error = str(e)
+            seconds = time.perf_counter() - started
+            results[step] = (seconds, detail, error)
+            conn.execute(
+                "INSERT INTO MaintenanceLog (RunId, Step, StartedAt, Seconds, Detail, Error) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, step, started_at.isoformat(' ', 'seconds'), round(seconds, 3), detail, error)
+            )
+            if error:
+                print(f"Maintenance step {step} failed: {error}")
+            elif verbose:
+                print(f"- {step}: {detail} ({seconds:.2f}s)")
+        return results
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh statistics, reclaim free pages and check the local database")
+    parser.add_argument('--analyze', action='store_true', help="Full ANALYZE even if statistics exist")
+    parser.add_argument('--vacuum', action='store_true', help="Reclaim free pages regardless of the threshold")
+    parser.add_argument('--integrity', action='store_true', help="Run the integrity check even if not due")
+    args = parser.parse_args()
+
+    print("Running database maintenance...")
+    run_maintenance(force_analyze=args.analyze, force_vacuum=args.vacuum, force_integrity=args.integrity)
@@ -0,0 +1,134 @@
+# play_arrays.py
+import argparse
+import sqlite3
+import sys
+from array import array
+from itertools import groupby
+from config import HITTRAX_CONFIG, DB_CONFIG
+
+# Columns kept in each session's blob and their array typecodes. Ids and
+# epoch seconds need 64 bits, Ms and Points 32; the HitTrax codes fit in
+# 16 bits and every measurement is stored as float32. Wider types come
+# first, so every column starts on a multiple of its item size.
+PLAY_ARRAY_COLUMNS = (
+    [('Id', 'q'), ('TimeStampEpoch', 'q')]
+    + [(name, 'f') for name in (
+        'ExitBallVel1', 'ExitBallVel2', 'ExitBallVel3', 'Distance', 'PitchVel',
+        'PosStart1', 'PosStart2', 'PosStart3', 'PosEnd1', 'PosEnd2', 'PosEnd3',
+        'PosPitch1', 'PosPitch2', 'PosPitch3', 'PosCaught1', 'PosCaught2', 'PosCaught3',
+        'PitchCoeffs1', 'PitchCoeffs2', 'PitchCoeffs3', 'PitchCoeffs4', 'PitchCoeffs5', 'PitchCoeffs6',
+        'PitchBreakH', 'PitchBreakV', 'Elevation', 'PitchBreakVG', 'GroundDist',
+        'Intersect1', 'Intersect2', 'Intersect3', 'PitchAngle', 'HorizontalAngle', 'ExitVelo'
+    )]
+    + [('Ms', 'i'), ('Points', 'i')]
+    + [(name, 'h') for name in ('Result', 'Type', 'Fielder', 'Quadrant', 'PitchType', 'Active')]
+)
+
+# Little-endian NumPy dtype of each typecode, recorded in PlayArrayLayout
+# so readers can decode the blobs without this module
+DTYPES = {'q': '<i8', 'i': '<i4', 'h': '<i2', 'f': '<f4'}
+
+# Sessions whose plays are read and encoded per query
+SESSIONS_PER_QUERY = 500
+
+def encode_plays(rows):
+    """
+    Pack one session's plays (PLAY_ARRAY_COLUMNS order, sorted by Id) into
+    a blob holding each column's values back to back
+    """
+    columns = []
+    for (_, code), values in zip(PLAY_ARRAY_COLUMNS, zip(*rows)):
+        column = array(code, values)
+        if sys.byteorder != 'little':
+            column.byteswap()
+        columns.append(column.tobytes())
+    return b''.join(columns)
+
+def stored_layout(conn):
+    return [tuple(row) for row in conn.execute("SELECT Name, Dtype FROM PlayArrayLayout ORDER BY Position")]
+
+def current_layout():
+    return [(name, DTYPES[code]) for name, code in PLAY_ARRAY_COLUMNS]
+
+def refresh_play_arrays(conn, session_ids):
+    """Re-encode the blobs of the given sessions; sessions without plays lose theirs"""
+    if not DB_CONFIG['play_arrays']:
+        return
+    session_ids = sorted(set(session_ids))
+    columns = ', '.join(name for name, _ in PLAY_ARRAY_COLUMNS)
+    for start in range(0, len(session_ids), SESSIONS_PER_QUERY):
+        chunk = session_ids[start:start + SESSIONS_PER_QUERY]
+        placeholders = ', '.join('?' * len(chunk))
+        conn.execute(f"DELETE FROM PlayArrays WHERE SessionId IN ({placeholders})", chunk)
+        rows = conn.execute(
+            f"SELECT SessionId, {columns} FROM Plays WHERE SessionId IN ({placeholders}) ORDER BY SessionId, Id",
+            chunk
+        ).fetchall()
+        for session_id, plays in groupby(rows, key=lambda row: row[0]):
+            plays = [play[1:] for play in plays]
+            conn.execute("INSERT INTO PlayArrays (SessionId, Rows, Data) VALUES (?, ?, ?)",
+                         (session_id, len(plays), encode_plays(plays)))
+
+def rebuild_play_arrays(conn):
+    """Re-encode every session's plays and record the current layout"""
+    if not DB_CONFIG['play_arrays']:
+        return
+    conn.execute("DELETE FROM PlayArrays")
+    conn.execute("DELETE FROM PlayArrayLayout")
+    conn.executemany("INSERT INTO PlayArrayLayout (Position, Name, Dtype) VALUES (?, ?, ?)",
+                     [(position, name, dtype) for position, (name, dtype) in enumerate(current_layout())])
+    # Per storage table: DISTINCT over the Plays view would copy every play
+    # into a temporary table first, while each partition answers from its
+    # SessionId index. schema imports this module, hence the late import.
+    from schema import storage_tables
+    sessions = set()
+    for storage in storage_tables(conn, 'Plays'):
+        sessions.update(row[0] for row in conn.execute(f"SELECT DISTINCT SessionId FROM {storage}"))
+    refresh_play_arrays(conn, sessions)
+
+def update_play_arrays(conn, condition, params, upsert):
+    """
+    Bring PlayArrays up to date after a Plays sync, in the sync's transaction
+
+    Like rollup.update_player_daily: a full load rebuilds every blob, an
+    upsert re-encodes only the sessions of the plays matched by the sync's
+    local filter (see sync.local_condition).
+    """
+    if not DB_CONFIG['play_arrays']:
+        return
+    if not upsert:
+        rebuild_play_arrays(conn)
+        return
+    sessions = conn.execute(f"SELECT DISTINCT SessionId FROM Plays WHERE {condition}", params).fetchall()
+    refresh_play_arrays(conn, [row[0] for row in sessions])
+
+def ensure_play_arrays(conn):
+    """
+    Match PlayArrays to DB_CONFIG['play_arrays'] when the schema is created
+
+    Enabled: build the blobs if they are missing or were written with an
+    older layout. Disabled: drop them, so stale arrays are never read.
+    """
+    if not DB_CONFIG['play_arrays']:
+        conn.execute("DELETE FROM PlayArrays")
+        conn.execute("DELETE FROM PlayArrayLayout")
+    elif stored_layout(conn) != current_layout() or not conn.execute("SELECT 1 FROM PlayArrays LIMIT 1").fetchone():
+        print("Building per-session play arrays...")
+        rebuild_play_arrays(conn)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the per-session play arrays (DB_CONFIG['play_arrays'])")
+    parser.add_argument('action', choices=['rebuild', 'stats'])
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    try:
+        if args.action == 'rebuild':
+            if not DB_CONFIG['play_arrays']:
+                sys.exit("Play arrays are disabled; set DB_CONFIG['play_arrays'] = True first")
+            rebuild_play_arrays(conn)
+            conn.commit()
+        sessions, plays, size = conn.execute("SELECT COUNT(*), SUM(Rows), SUM(length(Data)) FROM PlayArrays").fetchone()
+        print(f"{sessions:,} sessions, {plays or 0:,} plays, {(size or 0) / 1e6:.1f} MB of arrays")
+    finally:
+        conn.close()
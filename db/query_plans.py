@@ -0,0 +1,158 @@
+# query_plans.py
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from config import HITTRAX_CONFIG
+from reconcile import partition_filter
+from rollup import DAY_RANGE, PLAYER_DAILY_SELECT
+from schema import create_sqlite_schema, table_partitions
+from sync import INCREMENTAL_FILTER, local_condition
+
+DAY = ('2024-01-01', '2024-01-02')
+
+# Hot local queries and the plan step each must contain:
+# name -> (sql, params, expected EXPLAIN QUERY PLAN detail). A plan without
+# it has fallen back to scanning the table, or to reading rows an index
+# meant to cover. The dashboard queries mirror DatabaseManager in
+# db_utils.py. The full PlayerDaily rebuild reads nearly every session,
+# where no index beats a scan, so it has no check.
+PLAN_CHECKS = {
+    'PlayerDaily day refresh': (
+        PLAYER_DAILY_SELECT.format(condition=f'AND {DAY_RANGE}'), DAY,
+        'SEARCH Session USING INDEX idx_session_active_daily (Active=? AND TimeStamp>? AND TimeStamp<?)'
+    ),
+    'PlayerDaily day delete': (
+        "DELETE FROM PlayerDaily WHERE Day = ?", DAY[:1],
+        'SEARCH PlayerDaily USING PRIMARY KEY (Day=?)'
+    ),
+    'Incremental touched days': (
+        f"SELECT DISTINCT date(TimeStamp) FROM Session WHERE {local_condition(INCREMENTAL_FILTER)}", (0, DAY[0]),
+        'SEARCH Session USING INDEX idx_session_timestampepoch (TimeStampEpoch>?)'
+    ),
+    'Reconcile day delete': (
+        f"DELETE FROM Session WHERE {local_condition(partition_filter('Session', DAY[0], None)[0])}",
+        DAY,
+        'SEARCH Session USING INDEX idx_session_timestampepoch (TimeStampEpoch>? AND TimeStampEpoch<?)'
+    ),
+    'Session watermark': (
+        "SELECT TimeStamp FROM Session ORDER BY TimeStampEpoch DESC LIMIT 1", (),
+        'SCAN Session USING INDEX idx_session_timestampepoch'
+    ),
+    'Player details': (
+        """SELECT s.*, u.FullName FROM SessionConverted s JOIN UsersConverted u ON s.UserId = u.Id
+           WHERE s.UserId = ? ORDER BY s.TimeStamp DESC""", (1,),
+        'SEARCH Session USING INDEX idx_session_userid (UserId=?)'
+    ),
+    'Player stats by name': (
+        """SELECT u.Id, SUM(d.AB) FROM PlayerDaily d JOIN UsersConverted u ON d.UserId = u.Id
+           WHERE u.FullName IN (?, ?) GROUP BY u.Id HAVING SUM(d.AB) >= ?""", ('John Doe', 'Jane Doe', 10),
+        'SEARCH d USING INDEX idx_playerdaily_userid (UserId=?)'
+    ),
+    'Player name filter': (
+        "SELECT u.Id FROM UsersConverted u WHERE u.FullName IN (?, ?)", ('John Doe', 'Jane Doe'),
+        'SEARCH Users USING INDEX idx_users_fullname (FullName=?)'
+    )
+}
+
+def partition_checks(conn):
+    """
+    PLAN_CHECKS-style entries for each Plays season partition
+
+    The watermark is read partition by partition; a date range through the
+    Plays view must reach every partition's own epoch index. PlayArrays are
+    built from each partition's SessionIds, which its SessionId index
+    covers, and read back by SessionId.
+    """
+    checks = {}
+    for season, name in table_partitions(conn, 'Plays').items():
+        checks[f'Plays {season} sessions'] = (
+            f"SELECT DISTINCT SessionId FROM {name}", (),
+            f'SCAN {name} USING COVERING INDEX idx_plays_sessionid_{season}'
+        )
+        checks[f'Plays {season} by session'] = (
+            f"SELECT * FROM {name} WHERE SessionId IN (?, ?) ORDER BY SessionId, Id", (1, 2),
+            f'SEARCH {name} USING INDEX idx_plays_sessionid_{season} (SessionId=?)'
+        )
+        checks[f'Plays {season} watermark'] = (
+            f"SELECT TimeStampEpoch, TimeStamp FROM {name} ORDER BY TimeStampEpoch DESC LIMIT 1", (),
+            f'SCAN {name} USING INDEX idx_plays_timestampepoch_{season}'
+        )
+        checks[f'Plays {season} date range'] = (
+            f"SELECT * FROM PlaysConverted WHERE {local_condition('TimeStamp >= %s AND TimeStamp < %s')}", DAY,
+            f'SEARCH {name} USING INDEX idx_plays_timestampepoch_{season} (TimeStampEpoch>? AND TimeStampEpoch<?)'
+        )
+    return checks
+
+def query_plan(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines of a query"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def scratch_database(directory):
+    """Create the current schema in an empty database under directory and return its path"""
+    path = os.path.join(directory, 'query_plans.db')
+    configured = HITTRAX_CONFIG['sqlite_db']
+    HITTRAX_CONFIG['sqlite_db'] = path
+    try:
+        create_sqlite_schema()
+    finally:
+        HITTRAX_CONFIG['sqlite_db'] = configured
+    return path
+
+def connect_readonly(path):
+    """Open an existing database for plan checks without being able to change it"""
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+
+def check_query_plans(conn=None, verbose=True):
+    """
+    Check every PLAN_CHECKS query against the current schema
+
+    Without conn the checks run on a scratch database freshly created from
+    the schema, so the configured database is never touched and the plans
+    must hold without planner statistics. Pass a connection (see
+    connect_readonly) to check a loaded database as it is. Returns the
+    names of the checks whose plan is missing the expected step, so a
+    schema or query change that loses an index range scan is caught.
+    """
+    scratch = None
+    if conn is None:
+        scratch = tempfile.mkdtemp(prefix='hittrax-plans-')
+        conn = sqlite3.connect(scratch_database(scratch))
+
+    failures = []
+    try:
+        for name, (sql, params, expected) in {**PLAN_CHECKS, **partition_checks(conn)}.items():
+            plan = query_plan(conn, sql, params)
+            ok = expected in plan
+            if not ok:
+                failures.append(name)
+            if verbose:
+                print(f"{'ok  ' if ok else 'FAIL'} {name}")
+                if not ok:
+                    print(f"     expected: {expected}")
+                    for step in plan:
+                        print(f"     plan:     {step}")
+    finally:
+        if scratch:
+            conn.close()
+            shutil.rmtree(scratch, ignore_errors=True)
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the hot local queries are answered from their indexes")
+    parser.add_argument('--db', default=None,
+                        help="Check this existing database, read-only (default: a scratch database with the current schema)")
+    args = parser.parse_args()
+
+    if args.db:
+        conn = connect_readonly(args.db)
+        try:
+            failures = check_query_plans(conn)
+        finally:
+            conn.close()
+    else:
+        failures = check_query_plans()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,170 @@
+# reconcile.py
+import argparse
+from datetime import date, datetime, timedelta
+from config import DB_CONFIG
+from schema import archive_cutoff, storage_tables
+from play_arrays import refresh_play_arrays
+from rollup import refresh_player_daily
+from sync import SYNC_QUERIES, connect_source, connect_sqlite, local_condition, stream_rows, update_sync_state
+from sync_utils import SyncStats, log_sync_event
+
+# How each table is partitioned for comparison. Session is compared per day,
+# Plays per block of Ids. The fingerprint expressions are written so SQL
+# Server and SQLite evaluate them identically: measurements are HitTrax
+# `real` (float32) columns, which SQL Server would scale and round in
+# float32 while SQLite holds them as float64, so both sides widen them to
+# float before scaling.
+PARTITIONS = {
+    'Session': {
+        'source_key': 'CONVERT(date, TimeStamp)',
+        'local_key': 'date(TimeStamp)',
+        'fingerprint': """
+            COUNT(*),
+            SUM(CAST(Id AS BIGINT)),
+            SUM(CAST(UserId AS BIGINT)),
+            SUM(Active),
+            SUM(AB),
+            SUM(CAST(ROUND(CAST(MaxExitVel AS float) * 100, 0) AS BIGINT)),
+            SUM(CAST(ROUND(CAST(MaxDistance AS float) * 100, 0) AS BIGINT))
+        """
+    },
+    'Plays': {
+        'source_key': 'Id / {block}',
+        'local_key': 'Id / {block}',
+        'fingerprint': """
+            COUNT(*),
+            SUM(CAST(Id AS BIGINT)),
+            SUM(CAST(SessionId AS BIGINT)),
+            SUM(Active),
+            SUM(CAST(ROUND(CAST(ExitVelo AS float) * 100, 0) AS BIGINT)),
+            SUM(CAST(ROUND(CAST(Distance AS float) * 100, 0) AS BIGINT))
+        """
+    }
+}
+
+def normalize_key(table, key):
+    """Source and SQLite return day keys as date and text respectively"""
+    if table == 'Session':
+        return str(key)[:10]
+    return int(key)
+
+def partition_filter(table, key, block_size):
+    """Return a sargable WHERE condition and its params for one partition"""
+    if table == 'Session':
+        start = date.fromisoformat(key)
+        end = start + timedelta(days=1)
+        return "TimeStamp >= %s AND TimeStamp < %s", (start.isoformat(), end.isoformat())
+    return "Id BETWEEN %s AND %s", (key * block_size, (key + 1) * block_size - 1)
+
+def partition_signatures(cursor, table, key_expr, fingerprint, condition=None, params=()):
+    """Run the per-partition fingerprint query and return {key: signature}"""
+    where = f"WHERE {condition}" if condition else ""
+    cursor.execute(f"SELECT {key_expr}, {fingerprint} FROM {table} {where} GROUP BY {key_expr}", params)
+    return {normalize_key(table, row[0]): tuple(row[1:]) for row in cursor.fetchall()}
+
+def find_changed_partitions(source_conn, sqlite_conn, table, block_size=None):
+    """Compare row counts and fingerprints per partition and return the keys that differ"""
+    block_size = block_size or DB_CONFIG['reconcile_block_size']
+    spec = PARTITIONS[table]
+    # Archived seasons are no longer held locally (see archive.py)
+    cutoff = archive_cutoff(sqlite_conn, table)
+    condition, params = ("TimeStamp >= %s", (cutoff,)) if cutoff else (None, ())
+
+    source = partition_signatures(
+        source_conn.cursor(), table, spec['source_key'].format(block=block_size), spec['fingerprint'],
+        condition, params
+    )
+    local = partition_signatures(
+        sqlite_conn.cursor(), table, spec['local_key'].format(block=block_size), spec['fingerprint']
+    )
+    return sorted(key for key in source.keys() | local.keys() if source.get(key) != local.get(key))
+
+def reconcile_table(table, block_size=None, dry_run=False, verbose=True):
+    """
+    Resync only the partitions of a table that differ from the source
+
+    Each changed partition is deleted locally and re-pulled, which picks up
+    late edits and rows deleted on the HitTrax machine. All partitions are
+    replaced in one transaction. Returns the list of resynced partition keys.
+    """
+    block_size = block_size or DB_CONFIG['reconcile_block_size']
+    if verbose:
+        print(f"\nReconciling {table}...")
+
+    stats = SyncStats(table, 'reconcile')
+    source_conn = connect_source()
+    sqlite_conn = connect_sqlite()
+
+    try:
+        with stats.timer('fetch'):
+            changed = find_changed_partitions(source_conn, sqlite_conn, table, block_size)
+        if verbose:
+            print(f"Found {len(changed)} changed partitions in {table}")
+        if dry_run or not changed:
+            return changed
+
+        cutoff = archive_cutoff(sqlite_conn, table)
+        sqlite_conn.execute('BEGIN')
+        rows = 0
+        # Sessions whose plays were deleted or re-pulled, for PlayArrays
+        track_sessions = table == 'Plays' and DB_CONFIG['play_arrays']
+        sessions = set()
+        for key in changed:
+            condition, params = partition_filter(table, key, block_size)
+            if track_sessions:
+                sessions.update(row[0] for row in sqlite_conn.execute(
+                    f"SELECT SessionId FROM Plays WHERE {local_condition(condition)}", params))
+            for storage in storage_tables(sqlite_conn, table):
+                sqlite_conn.execute(f"DELETE FROM {storage} WHERE {local_condition(condition)}", params)
+            if cutoff:
+                condition, params = f"{condition} AND TimeStamp >= %s", params + (cutoff,)
+
+            source_cursor = source_conn.cursor()
+            source_cursor.execute(f"{SYNC_QUERIES[table]} WHERE {condition}", params)
+            rows += stream_rows(source_cursor, sqlite_conn, table, upsert=True, analyze=False, stats=stats)
+            if track_sessions:
+                sessions.update(row[0] for row in sqlite_conn.execute(
+                    f"SELECT SessionId FROM Plays WHERE {local_condition(condition)}", params))
+
+        with stats.timer('index'):
+            if table == 'Session':
+                refresh_player_daily(sqlite_conn, changed)
+            else:
+                refresh_play_arrays(sqlite_conn, sessions)
+        update_sync_state(sqlite_conn, table)
+        sqlite_conn.commit()
+        log_sync_event(stats)
+
+        if verbose:
+            print(f"Resynced {rows} rows across {len(changed)} partitions")
+        return changed
+
+    except Exception as e:
+        print(f"Error reconciling {table}: {str(e)}")
+        sqlite_conn.rollback()
+        log_sync_event(stats, e)
+        raise
+    finally:
+        source_conn.close()
+        sqlite_conn.close()
+
+def reconcile_all(dry_run=False):
+    """Reconcile Session and Plays against the source"""
+    print(f"Starting reconciliation at {datetime.now():%Y-%m-%d %H:%M:%S}...")
+    results = {}
+    for table in PARTITIONS:
+        results[table] = reconcile_table(table, dry_run=dry_run)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resync only the partitions that differ from HitTrax")
+    parser.add_argument('--table', choices=list(PARTITIONS), default=None,
+                        help="Reconcile a single table (default: Session and Plays)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Report changed partitions without resyncing them")
+    args = parser.parse_args()
+
+    if args.table:
+        reconcile_table(args.table, dry_run=args.dry_run)
+    else:
+        reconcile_all(dry_run=args.dry_run)
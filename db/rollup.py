@@ -0,0 +1,87 @@
+# rollup.py
+from datetime import date, timedelta
+
+# PlayerDaily's per-day columns, by how the dashboard combines them over
+# any range of days. The kinds are those of COLUMN_FORMATS in db_utils.py,
+# which checks at import that every column it declares is stored here:
+# 'best' and 'total' directly, 'weighted_avg' as SUM(AB x value) (column
+# ABx<name>, divided by SUM(AB)) and 'average' as SUM(value) (Sum<name>,
+# divided by SUM(Sessions)). AvgDistanceFeet is also kept AB-weighted for
+# the leaderboards. db_utils imports this module as db.rollup, so it only
+# imports the standard library.
+DAILY_STATS = {
+    'best': ['MaxExitVelMph', 'MaxPitchVelMph', 'MaxDistanceFeet', 'MaxGroundDistFeet', 'HHVelMph', 'MaxPoints'],
+    'total': ['Singles', 'Doubles', 'Triples', 'HomeRuns', 'HitCount', 'AB', 'FoulBalls',
+              'HHCount', 'PitchCount', 'Strikes', 'Balls', 'Score'],
+    'weighted_avg': ['AVG', 'SLG', 'AvgExitVelMph', 'AvgPitchVelMph', 'AvgDistanceFeet'],
+    'average': ['AvgDistanceFeet', 'AvgGroundDistFeet', 'LDPercentage', 'FBPercentage',
+                'GBPercentage', 'LIPercentage', 'RIPercentage', 'CIPercentage', 'LOPercentage',
+                'ROPercentage', 'COPercentage', 'RankMaxVel', 'RankAvgVel', 'RankMaxDist', 'RankPoints']
+}
+
+# PlayerDaily column and type, and the Session aggregate filling it, per kind
+DAILY_COLUMN = {
+    'best': ('{name}', 'NUMERIC', 'MAX({name})'),
+    'total': ('{name}', 'INTEGER NOT NULL', 'SUM({name})'),
+    'weighted_avg': ('ABx{name}', 'REAL', 'SUM({name} * AB)'),
+    'average': ('Sum{name}', 'REAL', 'SUM({name})')
+}
+
+def daily_columns():
+    """(PlayerDaily column, type, Session aggregate) for every DAILY_STATS column"""
+    columns = [('Sessions', 'INTEGER NOT NULL', 'COUNT(*)')]
+    for kind, names in DAILY_STATS.items():
+        column, sql_type, aggregate = DAILY_COLUMN[kind]
+        columns.extend((column.format(name=name), sql_type, aggregate.format(name=name)) for name in names)
+    return columns
+
+# One PlayerDaily row per user per day from that day's active sessions,
+# read through idx_session_active_daily. The converted columns are stored
+# on Session, so they are aggregated as they are.
+PLAYER_DAILY_SELECT = f"""
+    SELECT
+        UserId,
+        date(TimeStamp),
+        {', '.join(aggregate for _, _, aggregate in daily_columns())}
+    FROM Session
+    WHERE Active = 1 {{condition}}
+    GROUP BY UserId, date(TimeStamp)
+"""
+
+PLAYER_DAILY_INSERT = f"INSERT INTO PlayerDaily (UserId, Day, {', '.join(column for column, _, _ in daily_columns())})"
+
+# One day of sessions, bounded by 'YYYY-MM-DD' strings. TimeStamp is always
+# written as 'YYYY-MM-DD HH:MM:SS[.ffffff]', so text order is time order.
+DAY_RANGE = "TimeStamp >= ? AND TimeStamp < ?"
+
+def rebuild_player_daily(conn):
+    """Recompute the whole PlayerDaily rollup, e.g. after a full Session load"""
+    conn.execute("DELETE FROM PlayerDaily")
+    conn.execute(f"{PLAYER_DAILY_INSERT} {PLAYER_DAILY_SELECT.format(condition='')}")
+
+def refresh_player_daily(conn, days):
+    """Recompute PlayerDaily for the given days ('YYYY-MM-DD') only"""
+    for day in sorted(set(days)):
+        next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        conn.execute("DELETE FROM PlayerDaily WHERE Day = ?", (day,))
+        conn.execute(
+            f"{PLAYER_DAILY_INSERT} {PLAYER_DAILY_SELECT.format(condition=f'AND {DAY_RANGE}')}",
+            (day, next_day)
+        )
+
+def touched_days(conn, condition, params):
+    """Days of the local sessions matched by a sync filter (see sync.local_condition), i.e. the ones it just wrote"""
+    rows = conn.execute(f"SELECT DISTINCT date(TimeStamp) FROM Session WHERE {condition}", params)
+    return [row[0] for row in rows]
+
+def update_player_daily(conn, condition, params, upsert):
+    """
+    Bring PlayerDaily up to date after a Session sync, in the sync's transaction
+
+    A full load rebuilds the rollup; an upsert only recomputes the days of
+    the sessions it transferred.
+    """
+    if upsert:
+        refresh_player_daily(conn, touched_days(conn, condition, params))
+    else:
+        rebuild_player_daily(conn)
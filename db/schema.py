@@ -1,183 +1,332 @@
 # schema.py
+import re
 import sqlite3
 from datetime import datetime
+from config import HITTRAX_CONFIG
+from grad_years import refresh_grad_years, seed_grad_year_overrides
+from play_arrays import ensure_play_arrays
+from rollup import daily_columns, rebuild_player_daily
 
-def create_sqlite_schema():
-    """Create complete SQLite database schema for HitTrax data"""
-    
-    conn = sqlite3.connect('hittrax_local.db')
-    cursor = conn.cursor()
-    
-    try:
-        # First create your existing tables
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Users (
-            Id INTEGER PRIMARY KEY,
-            UnitId INTEGER NOT NULL,
-            FirstName TEXT NOT NULL,
-            LastName TEXT NOT NULL,
-            UserName TEXT NOT NULL,
-            Password TEXT NOT NULL,
-            Created TIMESTAMP,
-            Email TEXT,
-            Stadium INTEGER NOT NULL,
-            SkillLevel INTEGER NOT NULL,
-            GameType INTEGER NOT NULL,
-            Height REAL NOT NULL,
-            Role INTEGER NOT NULL,
-            Active INTEGER NOT NULL,
-            Weight REAL NOT NULL,
-            Position INTEGER NOT NULL,
-            Bats INTEGER NOT NULL,
-            Throws INTEGER NOT NULL,
-            School TEXT NOT NULL,
-            HomeTown TEXT NOT NULL,
-            GraduationYear INTEGER NOT NULL,
-            Gender INTEGER NOT NULL
-        )
-        ''')
-
-        # Create Session table (your existing code)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Session (
-            Id INTEGER PRIMARY KEY,
-            UnitId INTEGER NOT NULL,
-            UserId INTEGER NOT NULL,
-            UserUnitId INTEGER NOT NULL,
-            TimeStamp TIMESTAMP NOT NULL,
-            Stadium INTEGER NOT NULL,
-            Type INTEGER NOT NULL,
-            SkillLevel INTEGER NOT NULL,
-            GameType INTEGER NOT NULL,
-            MaxPitchVel REAL NOT NULL,
-            MaxExitVel REAL NOT NULL,
-            AvgPitchVel REAL NOT NULL,
-            AvgExitVel REAL NOT NULL,
-            AvgElevation REAL NOT NULL,
-            AvgDistance REAL NOT NULL,
-            MaxDistance REAL NOT NULL,
-            PitchCount INTEGER NOT NULL,
-            HitCount INTEGER NOT NULL,
-            Singles INTEGER NOT NULL,
-            Doubles INTEGER NOT NULL,
-            Triples INTEGER NOT NULL,
-            HomeRuns INTEGER NOT NULL,
-            FoulBalls INTEGER NOT NULL,
-            Strikes INTEGER NOT NULL,
-            Balls INTEGER NOT NULL,
-            AVG REAL NOT NULL,
-            SLG REAL NOT NULL,
-            LDPercentage REAL NOT NULL,
-            FBPercentage REAL NOT NULL,
-            GBPercentage REAL NOT NULL,
-            LIPercentage REAL NOT NULL,
-            RIPercentage REAL NOT NULL,
-            CIPercentage REAL NOT NULL,
-            LOPercentage REAL NOT NULL,
-            ROPercentage REAL NOT NULL,
-            COPercentage REAL NOT NULL,
-            StrikeZoneBottom REAL NOT NULL,
-            StrikeZoneTop REAL NOT NULL,
-            HHCount INTEGER NOT NULL,
-            HHVel REAL NOT NULL,
-            Active INTEGER NOT NULL,
-            StrikeZoneWidth REAL NOT NULL,
-            MaxGroundDist REAL NOT NULL,
-            AvgGroundDist REAL NOT NULL,
-            Score INTEGER NOT NULL,
-            MaxPoints INTEGER NOT NULL,
-            AB INTEGER NOT NULL,
-            Video INTEGER NOT NULL,
-            RankMaxVel REAL NOT NULL,
-            RankAvgVel REAL NOT NULL,
-            RankMaxDist REAL NOT NULL,
-            RankPoints REAL NOT NULL,
-            BatMaterial INTEGER NOT NULL,
-            FOREIGN KEY (UserId) REFERENCES Users(Id)
-        )
-        ''')
-        
-        # Create Plays table (your existing code)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Plays (
-            Id INTEGER PRIMARY KEY,
-            SessionId INTEGER NOT NULL,
-            TimeStamp TIMESTAMP NOT NULL,
-            ExitBallVel1 REAL NOT NULL,
-            ExitBallVel2 REAL NOT NULL,
-            ExitBallVel3 REAL NOT NULL,
-            Distance REAL NOT NULL,
-            PitchVel REAL NOT NULL,
-            Result INTEGER NOT NULL,
-            Type INTEGER NOT NULL,
-            Fielder INTEGER NOT NULL,
-            Quadrant INTEGER NOT NULL,
-            PosStart1 REAL NOT NULL,
-            PosStart2 REAL NOT NULL,
-            PosStart3 REAL NOT NULL,
-            PosEnd1 REAL NOT NULL,
-            PosEnd2 REAL NOT NULL,
-            PosEnd3 REAL NOT NULL,
-            PosPitch1 REAL NOT NULL,
-            PosPitch2 REAL NOT NULL,
-            PosPitch3 REAL NOT NULL,
-            PosCaught1 REAL NOT NULL,
-            PosCaught2 REAL NOT NULL,
-            PosCaught3 REAL NOT NULL,
-            PitchType INTEGER NOT NULL,
-            PitchCoeffs1 REAL NOT NULL,
-            PitchCoeffs2 REAL NOT NULL,
-            PitchCoeffs3 REAL NOT NULL,
-            PitchCoeffs4 REAL NOT NULL,
-            PitchCoeffs5 REAL NOT NULL,
-            PitchCoeffs6 REAL NOT NULL,
-            PitchBreakH REAL NOT NULL,
-            PitchBreakV REAL NOT NULL,
-            Elevation REAL NOT NULL,
-            PitchBreakVG REAL NOT NULL,
-            Ms INTEGER NOT NULL,
-            GroundDist REAL NOT NULL,
-            Active INTEGER NOT NULL,
-            Intersect1 REAL NOT NULL,
-            Intersect2 REAL NOT NULL,
-            Intersect3 REAL NOT NULL,
-            PitchAngle REAL NOT NULL,
-            HorizontalAngle REAL NOT NULL,
-            ExitVelo REAL NOT NULL,
-            Points INTEGER NOT NULL,
-            FOREIGN KEY (SessionId) REFERENCES Session(Id)
-        )
-        ''')
-
-        # Create the conversion views
-        cursor.execute('''
-        CREATE VIEW IF NOT EXISTS UsersConverted AS
-        SELECT 
-            Id,
-            UnitId,
-            FirstName,
-            LastName,
-            UserName,
-            Password,
-            Created,
-            Email,
-            Stadium,
-            SkillLevel,
-            CAST(ROUND(Height * 3.28084, 1) AS REAL) as HeightFeet,
-            CAST(ROUND(Weight * 2.20462) AS INTEGER) as WeightLbs,
-            Active,
-            Position,
-            Bats,
-            Throws,
-            School,
-            HomeTown,
-            GraduationYear,
-            Gender,
-            BirthDate
-        FROM Users
-        ''')
-
-        cursor.execute('''
+# Synced tables. {name} lets the same DDL build the staging copies used
+# by full syncs before they are swapped in.
+TABLES = {
+    'Users': '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        Id INTEGER PRIMARY KEY,
+        UnitId INTEGER NOT NULL,
+        FirstName TEXT NOT NULL,
+        LastName TEXT NOT NULL,
+        UserName TEXT NOT NULL,
+        Password TEXT NOT NULL,
+        Created TIMESTAMP,
+        Email TEXT,
+        Stadium INTEGER NOT NULL,
+        SkillLevel INTEGER NOT NULL,
+        GameType INTEGER NOT NULL,
+        Height REAL NOT NULL,
+        Role INTEGER NOT NULL,
+        Active INTEGER NOT NULL,
+        Weight REAL NOT NULL,
+        Position INTEGER NOT NULL,
+        Bats INTEGER NOT NULL,
+        Throws INTEGER NOT NULL,
+        School TEXT NOT NULL,
+        HomeTown TEXT NOT NULL,
+        GraduationYear INTEGER NOT NULL,
+        Gender INTEGER NOT NULL,
+        BirthDate TIMESTAMP,
+        -- Unit conversions, computed once when the row is written
+        HeightFeet REAL GENERATED ALWAYS AS (CAST(ROUND(Height * 3.28084, 1) AS REAL)) STORED,
+        WeightLbs INTEGER GENERATED ALWAYS AS (CAST(ROUND(Weight * 2.20462) AS INTEGER)) STORED,
+        -- Display and lookup name; NOCASE so lookups ignore capitalization
+        FullName TEXT COLLATE NOCASE GENERATED ALWAYS AS (trim(FirstName) || ' ' || trim(LastName)) STORED,
+        -- Not a source column: resolved by grad_years.refresh_grad_years after each sync
+        EffectiveGradYear INTEGER
+    )
+    ''',
+    'Session': '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        Id INTEGER PRIMARY KEY,
+        UnitId INTEGER NOT NULL,
+        UserId INTEGER NOT NULL,
+        UserUnitId INTEGER NOT NULL,
+        TimeStamp TIMESTAMP NOT NULL,
+        Stadium INTEGER NOT NULL,
+        Type INTEGER NOT NULL,
+        SkillLevel INTEGER NOT NULL,
+        GameType INTEGER NOT NULL,
+        MaxPitchVel REAL NOT NULL,
+        MaxExitVel REAL NOT NULL,
+        AvgPitchVel REAL NOT NULL,
+        AvgExitVel REAL NOT NULL,
+        AvgElevation REAL NOT NULL,
+        AvgDistance REAL NOT NULL,
+        MaxDistance REAL NOT NULL,
+        PitchCount INTEGER NOT NULL,
+        HitCount INTEGER NOT NULL,
+        Singles INTEGER NOT NULL,
+        Doubles INTEGER NOT NULL,
+        Triples INTEGER NOT NULL,
+        HomeRuns INTEGER NOT NULL,
+        FoulBalls INTEGER NOT NULL,
+        Strikes INTEGER NOT NULL,
+        Balls INTEGER NOT NULL,
+        AVG REAL NOT NULL,
+        SLG REAL NOT NULL,
+        LDPercentage REAL NOT NULL,
+        FBPercentage REAL NOT NULL,
+        GBPercentage REAL NOT NULL,
+        LIPercentage REAL NOT NULL,
+        RIPercentage REAL NOT NULL,
+        CIPercentage REAL NOT NULL,
+        LOPercentage REAL NOT NULL,
+        ROPercentage REAL NOT NULL,
+        COPercentage REAL NOT NULL,
+        StrikeZoneBottom REAL NOT NULL,
+        StrikeZoneTop REAL NOT NULL,
+        HHCount INTEGER NOT NULL,
+        HHVel REAL NOT NULL,
+        Active INTEGER NOT NULL,
+        StrikeZoneWidth REAL NOT NULL,
+        MaxGroundDist REAL NOT NULL,
+        AvgGroundDist REAL NOT NULL,
+        Score INTEGER NOT NULL,
+        MaxPoints INTEGER NOT NULL,
+        AB INTEGER NOT NULL,
+        Video INTEGER NOT NULL,
+        RankMaxVel REAL NOT NULL,
+        RankAvgVel REAL NOT NULL,
+        RankMaxDist REAL NOT NULL,
+        RankPoints REAL NOT NULL,
+        BatMaterial INTEGER NOT NULL,
+        -- Unit conversions, computed once when the row is written
+        MaxPitchVelMph REAL GENERATED ALWAYS AS (CAST(ROUND(MaxPitchVel * 2.23694, 1) AS REAL)) STORED,
+        MaxExitVelMph REAL GENERATED ALWAYS AS (CAST(ROUND(MaxExitVel * 2.23694, 1) AS REAL)) STORED,
+        AvgPitchVelMph REAL GENERATED ALWAYS AS (CAST(ROUND(AvgPitchVel * 2.23694, 1) AS REAL)) STORED,
+        AvgExitVelMph REAL GENERATED ALWAYS AS (CAST(ROUND(AvgExitVel * 2.23694, 1) AS REAL)) STORED,
+        HHVelMph REAL GENERATED ALWAYS AS (CAST(ROUND(HHVel * 2.23694, 1) AS REAL)) STORED,
+        AvgDistanceFeet INTEGER GENERATED ALWAYS AS (CAST(ROUND(AvgDistance * 3.28084) AS INTEGER)) STORED,
+        MaxDistanceFeet INTEGER GENERATED ALWAYS AS (CAST(ROUND(MaxDistance * 3.28084) AS INTEGER)) STORED,
+        MaxGroundDistFeet INTEGER GENERATED ALWAYS AS (CAST(ROUND(MaxGroundDist * 3.28084) AS INTEGER)) STORED,
+        AvgGroundDistFeet INTEGER GENERATED ALWAYS AS (CAST(ROUND(AvgGroundDist * 3.28084) AS INTEGER)) STORED,
+        -- Seconds since 1970 (TimeStamp read as UTC), for integer range filters
+        TimeStampEpoch INTEGER GENERATED ALWAYS AS (CAST(strftime('%s', TimeStamp) AS INTEGER)) STORED,
+        FOREIGN KEY (UserId) REFERENCES Users(Id)
+    )
+    ''',
+    'Plays': '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        Id INTEGER PRIMARY KEY,
+        SessionId INTEGER NOT NULL,
+        TimeStamp TIMESTAMP NOT NULL,
+        ExitBallVel1 REAL NOT NULL,
+        ExitBallVel2 REAL NOT NULL,
+        ExitBallVel3 REAL NOT NULL,
+        Distance REAL NOT NULL,
+        PitchVel REAL NOT NULL,
+        Result INTEGER NOT NULL,
+        Type INTEGER NOT NULL,
+        Fielder INTEGER NOT NULL,
+        Quadrant INTEGER NOT NULL,
+        PosStart1 REAL NOT NULL,
+        PosStart2 REAL NOT NULL,
+        PosStart3 REAL NOT NULL,
+        PosEnd1 REAL NOT NULL,
+        PosEnd2 REAL NOT NULL,
+        PosEnd3 REAL NOT NULL,
+        PosPitch1 REAL NOT NULL,
+        PosPitch2 REAL NOT NULL,
+        PosPitch3 REAL NOT NULL,
+        PosCaught1 REAL NOT NULL,
+        PosCaught2 REAL NOT NULL,
+        PosCaught3 REAL NOT NULL,
+        PitchType INTEGER NOT NULL,
+        PitchCoeffs1 REAL NOT NULL,
+        PitchCoeffs2 REAL NOT NULL,
+        PitchCoeffs3 REAL NOT NULL,
+        PitchCoeffs4 REAL NOT NULL,
+        PitchCoeffs5 REAL NOT NULL,
+        PitchCoeffs6 REAL NOT NULL,
+        PitchBreakH REAL NOT NULL,
+        PitchBreakV REAL NOT NULL,
+        Elevation REAL NOT NULL,
+        PitchBreakVG REAL NOT NULL,
+        Ms INTEGER NOT NULL,
+        GroundDist REAL NOT NULL,
+        Active INTEGER NOT NULL,
+        Intersect1 REAL NOT NULL,
+        Intersect2 REAL NOT NULL,
+        Intersect3 REAL NOT NULL,
+        PitchAngle REAL NOT NULL,
+        HorizontalAngle REAL NOT NULL,
+        ExitVelo REAL NOT NULL,
+        Points INTEGER NOT NULL,
+        -- Unit conversions, computed once when the row is written
+        ExitBallVel1Mph REAL GENERATED ALWAYS AS (CAST(ROUND(ExitBallVel1 * 2.23694, 1) AS REAL)) STORED,
+        ExitBallVel2Mph REAL GENERATED ALWAYS AS (CAST(ROUND(ExitBallVel2 * 2.23694, 1) AS REAL)) STORED,
+        ExitBallVel3Mph REAL GENERATED ALWAYS AS (CAST(ROUND(ExitBallVel3 * 2.23694, 1) AS REAL)) STORED,
+        PitchVelMph REAL GENERATED ALWAYS AS (CAST(ROUND(PitchVel * 2.23694, 1) AS REAL)) STORED,
+        ExitVeloMph REAL GENERATED ALWAYS AS (CAST(ROUND(ExitVelo * 2.23694, 1) AS REAL)) STORED,
+        DistanceFeet INTEGER GENERATED ALWAYS AS (CAST(ROUND(Distance * 3.28084) AS INTEGER)) STORED,
+        GroundDistFeet INTEGER GENERATED ALWAYS AS (CAST(ROUND(GroundDist * 3.28084) AS INTEGER)) STORED,
+        -- Seconds since 1970 (TimeStamp read as UTC), for integer range filters
+        TimeStampEpoch INTEGER GENERATED ALWAYS AS (CAST(strftime('%s', TimeStamp) AS INTEGER)) STORED,
+        FOREIGN KEY (SessionId) REFERENCES Session(Id)
+    )
+    '''
+}
+
+# Per-table high-water marks used by incremental sync
+SYNC_STATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS SyncState (
+        TableName TEXT PRIMARY KEY,
+        MaxId INTEGER,
+        MaxTimeStamp TIMESTAMP,
+        LastSync TIMESTAMP
+    )
+'''
+
+# Last check and last transfer of the background sync service (single row)
+SYNC_STATUS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS SyncStatus (
+        Id INTEGER PRIMARY KEY CHECK (Id = 1),
+        Status TEXT NOT NULL,
+        LastChecked TIMESTAMP,
+        LastSyncStarted TIMESTAMP,
+        LastSyncFinished TIMESTAMP,
+        LastSyncSeconds REAL,
+        LastSyncRows INTEGER,
+        LastError TEXT
+    )
+'''
+
+# Per-table telemetry of every sync run, written by sync_utils.log_sync_event
+SYNC_LOG_TABLE = '''
+    CREATE TABLE IF NOT EXISTS SyncLog (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        RunId TEXT NOT NULL,
+        TableName TEXT NOT NULL,
+        Mode TEXT NOT NULL,
+        StartedAt TIMESTAMP NOT NULL,
+        FetchSeconds REAL NOT NULL,
+        WriteSeconds REAL NOT NULL,
+        IndexSeconds REAL NOT NULL,
+        TotalSeconds REAL NOT NULL,
+        Rows INTEGER NOT NULL,
+        Bytes INTEGER NOT NULL,
+        RowsPerSec REAL,
+        Error TEXT
+    )
+'''
+
+# One row per step of every post-sync maintenance run (maintenance.py)
+MAINTENANCE_LOG_TABLE = '''
+    CREATE TABLE IF NOT EXISTS MaintenanceLog (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        RunId TEXT NOT NULL,
+        Step TEXT NOT NULL,
+        StartedAt TIMESTAMP NOT NULL,
+        Seconds REAL NOT NULL,
+        Detail TEXT,
+        Error TEXT
+    )
+'''
+
+# Seasons of partitioned tables moved out to their own database files by
+# db/archive.py. Syncs and reconciles skip everything before the newest one.
+PARTITION_ARCHIVE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS PartitionArchive (
+        TableName TEXT NOT NULL,
+        Season INTEGER NOT NULL,
+        Path TEXT NOT NULL,
+        Rows INTEGER NOT NULL,
+        ArchivedAt TIMESTAMP NOT NULL,
+        PRIMARY KEY (TableName, Season)
+    )
+'''
+
+# Manually maintained graduation years that win over the HitTrax profile.
+# Local only: syncs never overwrite it.
+GRAD_YEAR_OVERRIDE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS GradYearOverride (
+        UserId INTEGER PRIMARY KEY,
+        GradYear INTEGER NOT NULL
+    )
+'''
+
+# Names of grad_years.SEEDED_OVERRIDES already copied into GradYearOverride
+GRAD_YEAR_SEEDED_TABLE = '''
+    CREATE TABLE IF NOT EXISTS GradYearSeeded (
+        FullName TEXT PRIMARY KEY COLLATE NOCASE
+    )
+'''
+
+# Per-player, per-day totals of active sessions, maintained by rollup.py.
+# The dashboard summaries and leaderboards aggregate these instead of Session.
+# The stat columns come from rollup.DAILY_STATS.
+PLAYER_DAILY_TABLE = '''
+    CREATE TABLE IF NOT EXISTS PlayerDaily (
+        UserId INTEGER NOT NULL,
+        Day TEXT NOT NULL,
+        {columns},
+        PRIMARY KEY (Day, UserId)
+    ) WITHOUT ROWID
+'''.format(columns=',\n        '.join(f"{column} {sql_type}" for column, sql_type, _ in daily_columns()))
+
+# Player summaries filtered to a few players read PlayerDaily by account
+PLAYER_DAILY_INDEX = 'CREATE INDEX IF NOT EXISTS idx_playerdaily_userid ON PlayerDaily(UserId, Day)'
+
+# Optional per-session copy of Plays as packed column arrays, maintained by
+# play_arrays.py when DB_CONFIG['play_arrays'] is set. Data holds each
+# PlayArrayLayout column's Rows values back to back, in layout order.
+PLAY_ARRAYS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS PlayArrays (
+        SessionId INTEGER PRIMARY KEY,
+        Rows INTEGER NOT NULL,
+        Data BLOB NOT NULL
+    )
+'''
+
+PLAY_ARRAY_LAYOUT_TABLE = '''
+    CREATE TABLE IF NOT EXISTS PlayArrayLayout (
+        Position INTEGER PRIMARY KEY,
+        Name TEXT NOT NULL,
+        Dtype TEXT NOT NULL
+    )
+'''
+
+# Conversion views, in creation order. The converted values are stored
+# columns on the tables, so the views only pick the columns the dashboard reads.
+VIEWS = {
+    'UsersConverted': '''
+    CREATE VIEW IF NOT EXISTS UsersConverted AS
+    SELECT 
+        Id,
+        UnitId,
+        FirstName,
+        LastName,
+        FullName,
+        UserName,
+        Password,
+        Created,
+        Email,
+        Stadium,
+        SkillLevel,
+        HeightFeet,
+        WeightLbs,
+        Active,
+        Position,
+        Bats,
+        Throws,
+        School,
+        HomeTown,
+        GraduationYear,
+        EffectiveGradYear,
+        Gender,
+        BirthDate
+    FROM Users
+    ''',
+    'SessionConverted': '''
     CREATE VIEW IF NOT EXISTS SessionConverted AS
     SELECT 
         Id,
@@ -188,15 +337,15 @@ def create_sqlite_schema():
         Stadium,
         Type,
         SkillLevel,
-        CAST(ROUND(MaxPitchVel * 2.23694, 1) AS REAL) as MaxPitchVelMph,
-        CAST(ROUND(MaxExitVel * 2.23694, 1) AS REAL) as MaxExitVelMph,
-        CAST(ROUND(AvgPitchVel * 2.23694, 1) AS REAL) as AvgPitchVelMph,
-        CAST(ROUND(AvgExitVel * 2.23694, 1) AS REAL) as AvgExitVelMph,
-        CAST(ROUND(HHVel * 2.23694, 1) AS REAL) as HHVelMph,
-        CAST(ROUND(AvgDistance * 3.28084) AS INTEGER) as AvgDistanceFeet,
-        CAST(ROUND(MaxDistance * 3.28084) AS INTEGER) as MaxDistanceFeet,
-        CAST(ROUND(MaxGroundDist * 3.28084) AS INTEGER) as MaxGroundDistFeet,
-        CAST(ROUND(AvgGroundDist * 3.28084) AS INTEGER) as AvgGroundDistFeet,
+        MaxPitchVelMph,
+        MaxExitVelMph,
+        AvgPitchVelMph,
+        AvgExitVelMph,
+        HHVelMph,
+        AvgDistanceFeet,
+        MaxDistanceFeet,
+        MaxGroundDistFeet,
+        AvgGroundDistFeet,
         PitchCount,
         HitCount,
         Singles,
@@ -212,6 +361,9 @@ def create_sqlite_schema():
         FBPercentage,
         GBPercentage,
         LIPercentage,
+        RIPercentage,
+        CIPercentage,
+        LOPercentage,
         ROPercentage,
         COPercentage,
         StrikeZoneBottom,
@@ -229,43 +381,232 @@ def create_sqlite_schema():
         RankPoints,
         BatMaterial
     FROM Session
-    ''')
-        cursor.execute('''
-        CREATE VIEW IF NOT EXISTS PlaysConverted AS
-        SELECT 
-            Id,
-            SessionId,
-            TimeStamp,
-            CAST(ROUND(ExitBallVel1 * 2.23694, 1) AS REAL) as ExitBallVel1Mph,
-            CAST(ROUND(ExitBallVel2 * 2.23694, 1) AS REAL) as ExitBallVel2Mph,
-            CAST(ROUND(ExitBallVel3 * 2.23694, 1) AS REAL) as ExitBallVel3Mph,
-            CAST(ROUND(PitchVel * 2.23694, 1) AS REAL) as PitchVelMph,
-            CAST(ROUND(ExitVelo * 2.23694, 1) AS REAL) as ExitVeloMph,
-            CAST(ROUND(Distance * 3.28084) AS INTEGER) as DistanceFeet,
-            CAST(ROUND(GroundDist * 3.28084) AS INTEGER) as GroundDistFeet,
-            Result,
-            Type,
-            Fielder,
-            Quadrant,
-            PitchType,
-            Elevation,
-            Active,
-            Points
-        FROM Plays
-        ''')
-
-        # Create your existing indices
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_active ON Users(Active)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_skilllevel ON Users(SkillLevel)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_userid ON Session(UserId)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_timestamp ON Session(TimeStamp)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_skilllevel ON Session(SkillLevel)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_active ON Session(Active)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_plays_sessionid ON Plays(SessionId)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_plays_timestamp ON Plays(TimeStamp)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_plays_exitvelo ON Plays(ExitVelo)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_plays_distance ON Plays(Distance)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_plays_active ON Plays(Active)')
+    ''',
+    'PlaysConverted': '''
+    CREATE VIEW IF NOT EXISTS PlaysConverted AS
+    SELECT 
+        Id,
+        SessionId,
+        TimeStamp,
+        TimeStampEpoch,
+        ExitBallVel1Mph,
+        ExitBallVel2Mph,
+        ExitBallVel3Mph,
+        PitchVelMph,
+        ExitVeloMph,
+        DistanceFeet,
+        GroundDistFeet,
+        Result,
+        Type,
+        Fielder,
+        Quadrant,
+        PitchType,
+        Elevation,
+        Active,
+        Points
+    FROM Plays
+    '''
+}
+
+# Secondary indexes per synced table: index name -> indexed columns.
+# Each one serves a query in rollup.py, reconcile.py, sync.py or db_utils.py;
+# db/query_plans.py checks that the planner keeps using them.
+INDEXES = {
+    'Users': {
+        'idx_users_fullname': 'FullName',
+        'idx_users_effectivegradyear': 'EffectiveGradYear'
+    },
+    'Session': {
+        'idx_session_userid': 'UserId',
+        'idx_session_timestampepoch': 'TimeStampEpoch',
+        # PLAYER_DAILY_SELECT for one day: that day's active sessions. It reads
+        # most Session columns, so no index covers it; a full rebuild gains nothing
+        'idx_session_active_daily': 'Active, TimeStamp'
+    },
+    'Plays': {
+        'idx_plays_timestampepoch': 'TimeStampEpoch',
+        # play_arrays.py: a session's plays, and (covering) every SessionId with plays
+        'idx_plays_sessionid': 'SessionId'
+    }
+}
+
+# Synced tables stored as one table per season (calendar year of the given
+# column), e.g. Plays_2024, behind a UNION ALL view with the table's name.
+# Readers query the view; SQLite pushes WHERE clauses into every partition,
+# so a date range costs one index probe per season outside it.
+PARTITIONED_TABLES = {'Plays': 'TimeStamp'}
+
+# Ids per DELETE when an upsert clears rows from other partitions
+IDS_PER_DELETE = 500
+
+COLUMN_DEFINITION = re.compile(r'^\s*(\w+)\s+(?:INTEGER|REAL|TEXT|TIMESTAMP)\b(.*)$', re.M)
+PARTITION_NAME = re.compile(r'^(\w+)_(\d{4})$')
+
+def table_columns(table, generated=True):
+    """Columns declared for a synced table; generated=False leaves out the computed ones"""
+    return [name for name, rest in COLUMN_DEFINITION.findall(TABLES[table])
+            if generated or 'GENERATED' not in rest]
+
+def existing_columns(conn, table):
+    """Columns a table actually has in the database, generated ones included"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")]
+
+def object_type(conn, name):
+    """'table', 'view', 'index' or None for a schema object"""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+def partition_name(table, season, staging=False):
+    return f"{table}_{season}_Staging" if staging else f"{table}_{season}"
+
+def table_partitions(conn, table, staging=False):
+    """{season: table name} of a partitioned table's partitions, oldest first"""
+    pattern = re.compile(rf'^{table}_(\d{{4}})' + ('_Staging$' if staging else '$'))
+    names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()]
+    matches = [(int(match.group(1)), name) for name, match in ((name, pattern.match(name)) for name in names)
+               if match]
+    return dict(sorted(matches))
+
+def storage_tables(conn, table):
+    """The tables holding a synced table's rows: its partitions, or the table itself"""
+    if table in PARTITIONED_TABLES:
+        return list(table_partitions(conn, table).values())
+    return [table]
+
+def table_indexes(table):
+    """Declared secondary indexes of a storage table; a partition's names carry its season"""
+    match = PARTITION_NAME.match(table)
+    if match and match.group(1) in PARTITIONED_TABLES:
+        base, season = match.groups()
+        return {f"{name}_{season}": columns for name, columns in INDEXES[base].items()}
+    return INDEXES[table]
+
+def row_seasons(rows, column):
+    """Season of each row, from a datetime or 'YYYY-...' text value at position column"""
+    try:
+        return [row[column].year for row in rows]
+    except AttributeError:
+        return [int(str(row[column])[:4]) for row in rows]
+
+def archive_cutoff(conn, table):
+    """'YYYY-01-01' of the first season after a table's archived ones, or None"""
+    if object_type(conn, 'PartitionArchive') is None:
+        return None
+    row = conn.execute("SELECT MAX(Season) FROM PartitionArchive WHERE TableName = ?", (table,)).fetchone()
+    return f"{row[0] + 1}-01-01" if row[0] is not None else None
+
+def create_partition(conn, table, season, staging=False):
+    """
+    Create one season's partition (or staging partition) if it doesn't exist
+    and return its name. New live partitions get their indexes and are added
+    to the table's view.
+    """
+    name = partition_name(table, season, staging)
+    if object_type(conn, name) is None:
+        conn.execute(TABLES[table].format(name=name))
+        if not staging:
+            create_indexes(conn, name)
+            create_partition_views(conn)
+    return name
+
+def create_partition_views(cursor):
+    """(Re)create the UNION ALL view of each partitioned table over its current partitions"""
+    for table in PARTITIONED_TABLES:
+        partitions = storage_tables(cursor, table)
+        if not partitions:
+            # The view needs at least one table; start with this season
+            name = partition_name(table, datetime.now().year)
+            cursor.execute(TABLES[table].format(name=name))
+            create_indexes(cursor, name)
+            partitions = [name]
+        if object_type(cursor, table) == 'view':
+            cursor.execute(f"DROP VIEW {table}")
+        cursor.execute(f"CREATE VIEW {table} AS " + " UNION ALL ".join(f"SELECT * FROM {name}" for name in partitions))
+
+def create_views(cursor):
+    """(Re)create the partition views and the unit conversion views"""
+    create_partition_views(cursor)
+    # Recreated every time, so a database picks up columns added to a view
+    for view, ddl in VIEWS.items():
+        cursor.execute(f"DROP VIEW IF EXISTS {view}")
+        cursor.execute(ddl)
+
+def create_indexes(cursor, table):
+    """Create the secondary indexes declared for a synced table (every partition of a partitioned one)"""
+    for storage in storage_tables(cursor, table):
+        for name, columns in table_indexes(storage).items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {storage}({columns})')
+
+def drop_indexes(cursor, table):
+    """Drop the secondary indexes of a synced table ahead of a bulk load"""
+    for storage in storage_tables(cursor, table):
+        for name in table_indexes(storage):
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+def drop_stale_indexes(cursor, table):
+    """Drop secondary indexes an older schema left on a synced table, or declared differently there"""
+    for storage in storage_tables(cursor, table):
+        expected = {f'CREATE INDEX {name} ON {storage}({columns})' for name, columns in table_indexes(storage).items()}
+        stale = [name for name, sql in cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (storage,)
+        ).fetchall() if sql not in expected]
+        for name in stale:
+            cursor.execute(f'DROP INDEX {name}')
+
+def analyze_table(cursor, table):
+    """Refresh planner statistics for a table after a load"""
+    # Sample rather than scan every index row so large Plays loads stay quick
+    cursor.execute('PRAGMA analysis_limit=1000')
+    for storage in storage_tables(cursor, table):
+        cursor.execute(f'ANALYZE {storage}')
+
+def create_sqlite_schema():
+    """Create complete SQLite database schema for HitTrax data"""
+    
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    cursor = conn.cursor()
+    
+    try:
+        # WAL lets the dashboard keep reading the last committed snapshot
+        # while a sync is writing
+        cursor.execute('PRAGMA journal_mode=WAL')
+
+        for name, ddl in TABLES.items():
+            if name not in PARTITIONED_TABLES:
+                cursor.execute(ddl.format(name=name))
+        upgrade_tables(conn)
+        cursor.execute(SYNC_STATE_TABLE)
+        cursor.execute(SYNC_STATUS_TABLE)
+        cursor.execute(SYNC_LOG_TABLE)
+        cursor.execute(MAINTENANCE_LOG_TABLE)
+        # A rollup with other columns than rollup.DAILY_STATS is rebuilt below
+        if object_type(conn, 'PlayerDaily') and existing_columns(conn, 'PlayerDaily') != (
+                ['UserId', 'Day'] + [column for column, _, _ in daily_columns()]):
+            print("Upgrading PlayerDaily to the current columns...")
+            cursor.execute("DROP TABLE PlayerDaily")
+        cursor.execute(PLAYER_DAILY_TABLE)
+        cursor.execute(PLAYER_DAILY_INDEX)
+        # Before GradYearSeeded, every sync re-seeded GradYearOverride: the
+        # names are done already. Older databases without it still need them.
+        seeded_before = (object_type(conn, 'GradYearSeeded') is None
+                         and object_type(conn, 'GradYearOverride') is not None)
+        cursor.execute(GRAD_YEAR_OVERRIDE_TABLE)
+        cursor.execute(GRAD_YEAR_SEEDED_TABLE)
+        cursor.execute(PARTITION_ARCHIVE_TABLE)
+        cursor.execute(PLAY_ARRAYS_TABLE)
+        cursor.execute(PLAY_ARRAY_LAYOUT_TABLE)
+        # Picks up override edits and accounts upgraded from an older schema
+        seed_grad_year_overrides(conn, apply=not seeded_before)
+        refresh_grad_years(conn)
+        # First run against a database synced before the rollup existed, or upgraded above
+        if not cursor.execute("SELECT 1 FROM PlayerDaily LIMIT 1").fetchone():
+            rebuild_player_daily(conn)
+
+        create_views(cursor)
+        for table in TABLES:
+            drop_stale_indexes(cursor, table)
+            create_indexes(cursor, table)
+        ensure_play_arrays(conn)
 
         conn.commit()
         print("Successfully created SQLite schema with conversion views")
@@ -277,5 +618,153 @@ def create_sqlite_schema():
     finally:
         conn.close()
 
+def create_staging_table(conn, table):
+    """
+    Create an empty, index-free copy of a synced table and return its name.
+
+    A partitioned table only has its leftover staging partitions cleared;
+    insert_rows creates one per season as rows arrive.
+    """
+    if table in PARTITIONED_TABLES:
+        for name in table_partitions(conn, table, staging=True).values():
+            conn.execute(f"DROP TABLE {name}")
+        return None
+    staging = f"{table}_Staging"
+    conn.execute(f"DROP TABLE IF EXISTS {staging}")
+    conn.execute(TABLES[table].format(name=staging))
+    return staging
+
+def insert_rows(conn, table, columns, rows, upsert=False, staging=False):
+    """
+    Write a batch of rows into a synced table or its staging copy.
+
+    Rows of a partitioned table go to the partition of their season, which
+    is created on first use. Upserts replace rows by Id; for a partitioned
+    table a row whose season changed is also removed from its old partition.
+    """
+    if not rows:
+        return
+    verb = 'INSERT OR REPLACE' if upsert else 'INSERT'
+    insert = f"{verb} INTO {{target}} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if table not in PARTITIONED_TABLES:
+        conn.executemany(insert.format(target=f"{table}_Staging" if staging else table), rows)
+        return
+
+    seasons = row_seasons(rows, columns.index(PARTITIONED_TABLES[table]))
+    if seasons.count(seasons[0]) == len(seasons):
+        by_season = {seasons[0]: rows}
+    else:
+        by_season = {}
+        for season, row in zip(seasons, rows):
+            by_season.setdefault(season, []).append(row)
+
+    for season, season_rows in by_season.items():
+        target = create_partition(conn, table, season, staging)
+        if upsert and not staging:
+            ids = [row[columns.index('Id')] for row in season_rows]
+            for other in storage_tables(conn, table):
+                if other != target:
+                    delete_ids(conn, other, ids)
+        conn.executemany(insert.format(target=target), season_rows)
+
+def delete_ids(conn, storage, ids):
+    """
+    Delete the given Ids from one storage table, IDS_PER_DELETE per statement
+
+    Ids above the table's highest Id cannot be in it, so rows appended at
+    the source since the last sync cost no DELETE at all.
+    """
+    max_id = conn.execute(f"SELECT MAX(Id) FROM {storage}").fetchone()[0]
+    if max_id is None:
+        return
+    ids = [row_id for row_id in ids if row_id <= max_id]
+    for start in range(0, len(ids), IDS_PER_DELETE):
+        chunk = ids[start:start + IDS_PER_DELETE]
+        conn.execute(f"DELETE FROM {storage} WHERE Id IN ({', '.join('?' * len(chunk))})", chunk)
+
+def upgrade_tables(conn):
+    """
+    Rebuild synced tables created by an older schema.
+
+    A table missing declared columns (e.g. the stored unit conversions, which
+    ALTER TABLE cannot add) is copied into a staging table built from the
+    current DDL and swapped in. Generated columns are filled in by the copy.
+    A partitioned table still stored as a single table is split into season
+    partitions the same way. Returns the rebuilt tables.
+    """
+    outdated = []
+    for table in TABLES:
+        sources = [table] if object_type(conn, table) == 'table' else storage_tables(conn, table)
+        if table in PARTITIONED_TABLES and object_type(conn, table) == 'table':
+            outdated.append((table, sources))
+        elif any(set(table_columns(table)) - set(existing_columns(conn, source)) for source in sources):
+            outdated.append((table, sources))
+    if not outdated:
+        return []
+
+    if not conn.in_transaction:
+        conn.execute('BEGIN')
+    for table, sources in outdated:
+        print(f"Upgrading {table} to the current schema...")
+        staging = create_staging_table(conn, table)
+        for source in sources:
+            columns = ', '.join(column for column in table_columns(table, generated=False)
+                                if column in existing_columns(conn, source))
+            if table not in PARTITIONED_TABLES:
+                conn.execute(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {source}")
+                continue
+            key = PARTITIONED_TABLES[table]
+            for (season,) in conn.execute(f"SELECT DISTINCT substr({key}, 1, 4) FROM {source}").fetchall():
+                target = create_partition(conn, table, int(season), staging=True)
+                conn.execute(
+                    f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} WHERE substr({key}, 1, 4) = ?",
+                    (season,)
+                )
+    swap_in_staging_tables(conn, [table for table, _ in outdated])
+    return [table for table, _ in outdated]
+
+def swap_in_staging_tables(conn, tables):
+    """
+    Replace synced tables with their freshly loaded staging copies.
+
+    Runs in the caller's transaction (one is opened if needed), so readers
+    see either the old tables or the new ones, never a half-built state.
+    Views are dropped first because RENAME would otherwise repoint them at
+    the outgoing table; they and the indexes are rebuilt, and the tables
+    analyzed, before commit. A partitioned table's partitions are all
+    replaced by its staging partitions.
+    """
+    if not tables:
+        return
+    if not conn.in_transaction:
+        conn.execute('BEGIN')
+
+    cursor = conn.cursor()
+    for view in VIEWS:
+        cursor.execute(f"DROP VIEW IF EXISTS {view}")
+    for table in PARTITIONED_TABLES:
+        if object_type(cursor, table) == 'view':
+            cursor.execute(f"DROP VIEW {table}")
+
+    for table in tables:
+        if table not in PARTITIONED_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"ALTER TABLE {table}_Staging RENAME TO {table}")
+            create_indexes(cursor, table)
+            analyze_table(cursor, table)
+            continue
+
+        if object_type(cursor, table) == 'table':
+            cursor.execute(f"DROP TABLE {table}")
+        for name in storage_tables(cursor, table):
+            cursor.execute(f"DROP TABLE {name}")
+        for season, staging in table_partitions(cursor, table, staging=True).items():
+            name = partition_name(table, season)
+            cursor.execute(f"ALTER TABLE {staging} RENAME TO {name}")
+            create_indexes(cursor, name)
+            analyze_table(cursor, name)
+
+    create_views(cursor)
+
 if __name__ == "__main__":
-    create_sqlite_schema()
\ No newline at end of file
+    create_sqlite_schema()
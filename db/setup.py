@@ -20,6 +20,17 @@ def setup_local_db():
         
         if test_source_connection():
             sync_all()
+
+            # 3. Confirm the hot queries use their indexes on the loaded data
+            print("\nChecking query plans...")
+            from query_plans import check_query_plans, connect_readonly
+            conn = connect_readonly(HITTRAX_CONFIG['sqlite_db'])
+            try:
+                if check_query_plans(conn):
+                    print("Warning: some queries no longer use their indexes (see above)")
+            finally:
+                conn.close()
+
             print("\nSetup complete!")
             print("\nYou can now use the local database at:", 
                   Path(HITTRAX_CONFIG['sqlite_db']).absolute())
@@ -0,0 +1,236 @@
+# snapshot.py
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from array import array
+from datetime import datetime
+from config import HITTRAX_CONFIG, DB_CONFIG
+from grad_years import refresh_grad_years, seed_grad_year_overrides
+from play_arrays import rebuild_play_arrays
+from rollup import rebuild_player_daily
+from schema import (create_sqlite_schema, create_staging_table, swap_in_staging_tables, table_columns,
+                    insert_rows, storage_tables)
+from sync_utils import SyncStats, log_sync_event
+
+SNAPSHOT_TABLES = ['Users', 'Session', 'Plays']
+SNAPSHOT_FORMAT = 1
+MANIFEST = 'manifest.json'
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def encode_column(values):
+    """
+    Pack one column's values, as typed binary when possible
+
+    Numeric columns without NULLs become array('q') / array('d') bytes;
+    anything else (text, timestamps, NULLs) falls back to JSON.
+    """
+    if all(type(value) is int for value in values):
+        try:
+            return 'q', array('q', values).tobytes()
+        except OverflowError:
+            pass
+    elif all(type(value) in (int, float) for value in values):
+        return 'd', array('d', values).tobytes()
+    return 'json', json.dumps(values, separators=(',', ':')).encode('utf-8')
+
+def decode_column(kind, payload, byteorder):
+    if kind == 'json':
+        return json.loads(payload.decode('utf-8'))
+    values = array(kind)
+    values.frombytes(payload)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+def write_chunk(path, columns, rows):
+    """
+    Write one chunk of rows column by column into a gzip file
+
+    The file is a JSON header line describing each column's encoding and
+    length, followed by the column payloads back to back. Storing a column's
+    values contiguously lets gzip exploit their repetition (ids, flags,
+    timestamps), which row-wise dumps don't.
+    """
+    encoded = [encode_column(list(values)) for values in zip(*rows)]
+    header = {
+        'byteorder': sys.byteorder,
+        'columns': [{'name': name, 'kind': kind, 'bytes': len(payload)}
+                    for name, (kind, payload) in zip(columns, encoded)]
+    }
+    with gzip.open(path, 'wb', compresslevel=1) as f:
+        f.write(json.dumps(header).encode('utf-8') + b'\n')
+        for _, payload in encoded:
+            f.write(payload)
+
+def read_chunk(path, columns):
+    """Read a chunk back and return its rows in the given column order"""
+    with gzip.open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        data = {}
+        for column in header['columns']:
+            data[column['name']] = decode_column(column['kind'], f.read(column['bytes']), header['byteorder'])
+    return list(zip(*(data[name] for name in columns)))
+
+def export_snapshot(path, rows_per_file=None):
+    """
+    Dump Users, Session and Plays from the local database into a snapshot directory
+
+    All tables are read inside one transaction, so the snapshot is consistent
+    even while a sync is writing. The manifest records columns, row counts,
+    file checksums and the SyncState watermarks, so a node loaded from the
+    snapshot can continue with incremental syncs.
+    """
+    rows_per_file = rows_per_file or DB_CONFIG['snapshot_rows_per_file']
+    os.makedirs(path, exist_ok=True)
+    print(f"Exporting snapshot to {path}...")
+
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    try:
+        conn.execute('BEGIN')
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'created': datetime.now().isoformat(' ', 'seconds'),
+            'tables': {},
+            'sync_state': [list(row) for row in conn.execute("SELECT * FROM SyncState")],
+            'grad_year_overrides': [list(row) for row in conn.execute("SELECT * FROM GradYearOverride")],
+            'grad_year_seeded': [list(row) for row in conn.execute("SELECT * FROM GradYearSeeded")],
+            # Seasons missing from the tables below; incremental syncs keep skipping them
+            'partition_archive': [list(row) for row in conn.execute("SELECT * FROM PartitionArchive")]
+        }
+
+        for table in SNAPSHOT_TABLES:
+            # Generated columns are recomputed by SQLite on import
+            columns = table_columns(table, generated=False)
+            files = []
+            total = 0
+            # Partition by partition, so a chunk holds a single season
+            for storage in storage_tables(conn, table):
+                cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {storage} ORDER BY Id")
+                while True:
+                    rows = cursor.fetchmany(rows_per_file)
+                    if not rows:
+                        break
+                    name = f"{table}-{len(files):04d}.col.gz"
+                    write_chunk(os.path.join(path, name), columns, rows)
+                    files.append({'name': name, 'rows': len(rows), 'sha256': file_sha256(os.path.join(path, name))})
+                    total += len(rows)
+
+            manifest['tables'][table] = {'columns': columns, 'rows': total, 'files': files}
+            print(f"- {table}: {total:,} rows in {len(files)} files")
+
+        conn.rollback()
+    finally:
+        conn.close()
+
+    # Written last: a directory without a manifest is an incomplete export
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    print(f"Snapshot complete ({size / 1e6:.1f} MB)")
+    return manifest
+
+def import_snapshot(path, verify=True):
+    """
+    Load a snapshot directory into the local database without touching the source
+
+    Each table is bulk loaded into its staging copy with indexes built
+    afterwards, then all tables are swapped in and SyncState is restored
+    in a single transaction. Returns a dict of row counts per table.
+    """
+    manifest_path = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"No {MANIFEST} in {path}; the snapshot is missing or incomplete")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest['format'] != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest['format']}")
+
+    print(f"Importing snapshot from {path} (created {manifest['created']})...")
+    create_sqlite_schema()
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    conn.execute(f"PRAGMA cache_size = -{DB_CONFIG['sync_cache_kib']}")
+    stats = {table: SyncStats(table, 'snapshot_import') for table in manifest['tables']}
+    counts = {}
+
+    try:
+        conn.execute('BEGIN')
+        for table, spec in manifest['tables'].items():
+            columns = spec['columns']
+            create_staging_table(conn, table)
+            counts[table] = 0
+
+            for chunk in spec['files']:
+                chunk_path = os.path.join(path, chunk['name'])
+                with stats[table].timer('fetch'):
+                    if verify and file_sha256(chunk_path) != chunk['sha256']:
+                        raise ValueError(f"Checksum mismatch in {chunk['name']}")
+                    rows = read_chunk(chunk_path, columns)
+                stats[table].add_batch(rows)
+                with stats[table].timer('write'):
+                    insert_rows(conn, table, columns, rows, staging=True)
+                counts[table] += len(rows)
+
+            if counts[table] != spec['rows']:
+                raise ValueError(f"{table}: expected {spec['rows']} rows, loaded {counts[table]}")
+            print(f"- {table}: {counts[table]:,} rows")
+
+        for table in manifest['tables']:
+            with stats[table].timer('index'):
+                swap_in_staging_tables(conn, [table])
+        # Overrides made on this machine win over the snapshot's
+        conn.executemany("INSERT OR IGNORE INTO GradYearOverride VALUES (?, ?)",
+                         manifest.get('grad_year_overrides', []))
+        conn.executemany("INSERT OR IGNORE INTO GradYearSeeded VALUES (?)", manifest.get('grad_year_seeded', []))
+        conn.executemany("INSERT OR IGNORE INTO PartitionArchive VALUES (?, ?, ?, ?, ?)",
+                         manifest.get('partition_archive', []))
+        with stats['Users'].timer('index'):
+            seed_grad_year_overrides(conn)
+            refresh_grad_years(conn)
+        with stats['Session'].timer('index'):
+            rebuild_player_daily(conn)
+        with stats['Plays'].timer('index'):
+            rebuild_play_arrays(conn)
+
+        conn.execute("DELETE FROM SyncState")
+        conn.executemany("INSERT INTO SyncState VALUES (?, ?, ?, ?)", manifest['sync_state'])
+        conn.commit()
+        for table_stats in stats.values():
+            log_sync_event(table_stats)
+
+        print("Snapshot import complete!")
+        return counts
+
+    except Exception as e:
+        print(f"Error importing snapshot: {str(e)}")
+        conn.rollback()
+        for table_stats in stats.values():
+            log_sync_event(table_stats, e)
+        raise
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import a portable snapshot of the local database")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('path', help="Snapshot directory")
+    parser.add_argument('--rows-per-file', type=int, default=None,
+                        help="Rows per chunk file on export (default: DB_CONFIG['snapshot_rows_per_file'])")
+    parser.add_argument('--no-verify', action='store_true',
+                        help="Skip checksum verification on import")
+    args = parser.parse_args()
+
+    if args.action == 'export':
+        export_snapshot(args.path, args.rows_per_file)
+    else:
+        import_snapshot(args.path, verify=not args.no_verify)
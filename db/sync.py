@@ -1,184 +1,584 @@
 # sync.py
+import argparse
 import pymssql
+import queue
+import re
 import sqlite3
-import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from config import HITTRAX_CONFIG
-from sync_utils import convert_units_before_save, log_sync_event
+from config import HITTRAX_CONFIG, DB_CONFIG
+from schema import (create_sqlite_schema, create_staging_table, swap_in_staging_tables,
+                    create_indexes, drop_indexes, analyze_table, insert_rows, storage_tables,
+                    archive_cutoff)
+from grad_years import refresh_grad_years, seed_grad_year_overrides
+from maintenance import run_maintenance
+from play_arrays import update_play_arrays
+from rollup import update_player_daily
+from sync_utils import SyncStats, log_sync_event, new_run_id
 
-def sync_users(verbose=True):
+# Store source datetimes in the same text format pandas.to_sql used
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+# Source queries; the SELECT lists define the columns copied for each table
+USERS_QUERY = """
+    SELECT 
+        Id, UnitId, FirstName, LastName, UserName, Password,
+        Created, Email, Stadium, SkillLevel, GameType, Height,
+        Role, Active, Weight, Position, Bats, Throws,
+        School, HomeTown, GraduationYear, Gender, BirthDate
+    FROM Users
+    """
+
+SESSION_QUERY = """
+    SELECT 
+        Id, UnitId, UserId, UserUnitId, TimeStamp, Stadium, Type,
+        SkillLevel, GameType, MaxPitchVel, MaxExitVel, AvgPitchVel,
+        AvgExitVel, AvgElevation, AvgDistance, MaxDistance, PitchCount,
+        HitCount, Singles, Doubles, Triples, HomeRuns, FoulBalls,
+        Strikes, Balls, AVG, SLG, LDPercentage, FBPercentage,
+        GBPercentage, LIPercentage, RIPercentage, CIPercentage,
+        LOPercentage, ROPercentage, COPercentage, StrikeZoneBottom,
+        StrikeZoneTop, HHCount, HHVel, Active, StrikeZoneWidth,
+        MaxGroundDist, AvgGroundDist, Score, MaxPoints, AB, Video,
+        RankMaxVel, RankAvgVel, RankMaxDist, RankPoints, BatMaterial
+    FROM Session 
+    """
+
+PLAYS_QUERY = """
+    SELECT 
+        Id, SessionId, TimeStamp, ExitBallVel1, ExitBallVel2,
+        ExitBallVel3, Distance, PitchVel, Result, Type, Fielder,
+        Quadrant, PosStart1, PosStart2, PosStart3, PosEnd1, PosEnd2,
+        PosEnd3, PosPitch1, PosPitch2, PosPitch3, PosCaught1,
+        PosCaught2, PosCaught3, PitchType, PitchCoeffs1, PitchCoeffs2,
+        PitchCoeffs3, PitchCoeffs4, PitchCoeffs5, PitchCoeffs6,
+        PitchBreakH, PitchBreakV, Elevation, PitchBreakVG, Ms,
+        GroundDist, Active, Intersect1, Intersect2, Intersect3,
+        PitchAngle, HorizontalAngle, ExitVelo, Points
+    FROM Plays 
+    """
+
+SYNC_QUERIES = {
+    'Users': USERS_QUERY,
+    'Session': SESSION_QUERY,
+    'Plays': PLAYS_QUERY
+}
+
+# New rows, or rows inside the lookback window: (max_id, cutoff)
+INCREMENTAL_FILTER = "(Id > %s OR TimeStamp >= %s)"
+
+def get_sync_state(sqlite_conn, table):
+    """Return the stored (MaxId, MaxTimeStamp) watermark for a table, or (None, None)"""
+    row = sqlite_conn.execute(
+        "SELECT MaxId, MaxTimeStamp FROM SyncState WHERE TableName = ?", (table,)
+    ).fetchone()
+    return row if row else (None, None)
+
+def update_sync_state(sqlite_conn, table):
+    """Record the current high-water mark of a local table in SyncState"""
+    # Per storage table, so each partition answers from its own indexes
+    max_id, latest = None, None
+    for storage in storage_tables(sqlite_conn, table):
+        storage_max = sqlite_conn.execute(f"SELECT MAX(Id) FROM {storage}").fetchone()[0]
+        storage_latest = sqlite_conn.execute(
+            f"SELECT TimeStampEpoch, TimeStamp FROM {storage} ORDER BY TimeStampEpoch DESC LIMIT 1"
+        ).fetchone()
+        if storage_max is not None and (max_id is None or storage_max > max_id):
+            max_id = storage_max
+        if storage_latest and (latest is None or storage_latest[0] > latest[0]):
+            latest = storage_latest
+    max_ts = latest[1] if latest else None
+    sqlite_conn.execute(
+        "INSERT OR REPLACE INTO SyncState (TableName, MaxId, MaxTimeStamp, LastSync) VALUES (?, ?, ?, ?)",
+        (table, max_id, max_ts, datetime.now().isoformat(' ', 'seconds'))
+    )
+
+def build_incremental_filter(sqlite_conn, table):
+    """
+    Build the WHERE condition for an incremental pull.
+
+    Rows above the Id watermark are new; rows whose TimeStamp falls inside the
+    lookback window are re-pulled so recent edits are upserted as well.
+    Returns (None, None) when the table has never been synced.
+    """
+    max_id, max_ts = get_sync_state(sqlite_conn, table)
+    if max_id is None:
+        return None, None
+
+    cutoff = datetime.fromisoformat(str(max_ts)) - timedelta(days=DB_CONFIG['incremental_lookback_days'])
+    return INCREMENTAL_FILTER, (max_id, cutoff)
+
+def build_sync_filter(sqlite_conn, table, days_back=None, incremental=False):
+    """
+    Work out which source rows a sync of `table` should pull.
+
+    Returns (condition, params, upsert). upsert is False for a full copy,
+    in which case the local table is replaced rather than upserted into.
+    Seasons archived out of the local database (see archive.py) are never
+    pulled again, so condition is None only for a full copy of everything.
+    """
+    condition, params, upsert = None, None, False
+    if incremental:
+        condition, params = build_incremental_filter(sqlite_conn, table)
+        upsert = condition is not None
+    elif days_back is not None:
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        condition, params, upsert = "TimeStamp >= %s", (cutoff_date,), True
+
+    cutoff = archive_cutoff(sqlite_conn, table)
+    if cutoff:
+        archived = "TimeStamp >= %s"
+        condition = f"{condition} AND {archived}" if condition else archived
+        params = tuple(params or ()) + (datetime.fromisoformat(cutoff),)
+    return condition, params, upsert
+
+def local_condition(condition):
+    """
+    Rewrite a source-side filter for the local tables.
+
+    Placeholders become '?' and TimeStamp bounds are moved onto the indexed
+    TimeStampEpoch column, so SQLite range-scans the index instead of
+    comparing timestamp text row by row. None (a full copy) passes through.
+    """
+    if condition is None:
+        return None
+    return re.sub(
+        r'\bTimeStamp (>=|>|<=|<) \?',
+        r"TimeStampEpoch \1 CAST(strftime('%s', ?) AS INTEGER)",
+        condition.replace('%s', '?')
+    )
+
+def connect_source():
+    """
+    Open a connection to the HitTrax SQL Server.
+
+    When DB_CONFIG['fake_source'] names a database built by generate_data.py,
+    the local stand-in in fake_source.py is opened instead.
+    """
+    if DB_CONFIG['fake_source']:
+        import fake_source
+        return fake_source.connect(DB_CONFIG['fake_source'])
+    return pymssql.connect(**HITTRAX_CONFIG['source_db'])
+
+def connect_sqlite():
+    """Open the local database with settings suited to bulk loads"""
+    sqlite_conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    # A larger page cache keeps index rebuilds after a load mostly in memory
+    sqlite_conn.execute(f"PRAGMA cache_size=-{DB_CONFIG['sync_cache_kib']}")
+    return sqlite_conn
+
+def count_source_rows(source_conn, table, condition, params):
+    """Count the source rows an upsert is about to transfer"""
+    query = f"SELECT COUNT(*) FROM {table}"
+    if condition:
+        query += f" WHERE {condition}"
+    cursor = source_conn.cursor()
+    cursor.execute(query, params)
+    return cursor.fetchone()[0]
+
+def should_defer_indexes(source_conn, table, condition, params, upsert):
+    """
+    Decide whether an upsert is large enough to load without indexes.
+
+    Full loads always go into index-free staging tables, so this only matters
+    for upserts; past DB_CONFIG['defer_index_threshold'] rows it is cheaper
+    to rebuild the secondary indexes once than to maintain them per row.
+    """
+    if not upsert:
+        return False
+    return count_source_rows(source_conn, table, condition, params) >= DB_CONFIG['defer_index_threshold']
+
+def stream_rows(source_cursor, sqlite_conn, table, upsert, batch_size=None, defer_indexes=False, analyze=True,
+                stats=None):
+    """
+    Stream an executed source query into a local table.
+
+    Rows are pulled with fetchmany and written with executemany, so only one
+    batch is held in memory no matter how large the table is. Everything runs
+    in one transaction, committed by the caller. With upsert=True rows are
+    merged into the live table with INSERT OR REPLACE on the Id primary key,
+    so older history is left untouched; defer_indexes drops the secondary
+    indexes for the load and rebuilds them afterwards. With upsert=False
+    (full sync) rows are loaded into an index-free staging table that is
+    swapped in atomically once the load completes. Rows of a partitioned
+    table are routed to their season's partition by schema.insert_rows.
+    Either way the table's typed DDL is kept; analyze=False skips the
+    statistics refresh for callers making many small loads. Fetch, write
+    and index/swap time are accumulated into stats when given.
+    """
+    batch_size = batch_size or DB_CONFIG['batch_size']
+    stats = stats or SyncStats(table, 'untracked')
+    columns = [col[0] for col in source_cursor.description]
+
+    if not sqlite_conn.in_transaction:
+        sqlite_conn.execute('BEGIN')
+    if not upsert:
+        create_staging_table(sqlite_conn, table)
+    if upsert and defer_indexes:
+        drop_indexes(sqlite_conn, table)
+
+    total = 0
+    while True:
+        with stats.timer('fetch'):
+            rows = source_cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        stats.add_batch(rows)
+        with stats.timer('write'):
+            insert_rows(sqlite_conn, table, columns, rows, upsert, staging=not upsert)
+        total += len(rows)
+
+    with stats.timer('index'):
+        if not upsert:
+            swap_in_staging_tables(sqlite_conn, [table])
+        elif total:
+            if defer_indexes:
+                create_indexes(sqlite_conn, table)
+            if analyze:
+                analyze_table(sqlite_conn, table)
+    return total
+
+def sync_users(batch_size=None, verbose=True, run_id=None):
     """Sync ALL Users from HitTrax to SQLite"""
     if verbose:
         print("\nSyncing Users table...")
     
-    source_conn = pymssql.connect(**HITTRAX_CONFIG['source_db'])
-    sqlite_conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    stats = SyncStats('Users', 'full', run_id)
+    source_conn = connect_source()
+    sqlite_conn = connect_sqlite()
     
     try:
-        query = """
-        SELECT 
-            Id, UnitId, FirstName, LastName, UserName, Password,
-            Created, Email, Stadium, SkillLevel, GameType, Height,
-            Role, Active, Weight, Position, Bats, Throws,
-            School, HomeTown, GraduationYear, Gender, BirthDate
-        FROM Users
-        """
+        query = USERS_QUERY
         
         if verbose:
             print("Fetching all users from source database...")
         
-        df = pd.read_sql(query, source_conn)
+        source_cursor = source_conn.cursor()
+        source_cursor.execute(query)
         # Data comes in metric, no need to convert
         
-        df.to_sql('Users', sqlite_conn, if_exists='replace', index=False)
+        count = stream_rows(source_cursor, sqlite_conn, 'Users', upsert=False, batch_size=batch_size,
+                            stats=stats)
+        with stats.timer('index'):
+            seed_grad_year_overrides(sqlite_conn)
+            refresh_grad_years(sqlite_conn)
         
         if verbose:
-            print(f"Successfully synced {len(df)} users")
+            print(f"Successfully synced {count} users")
         
         sqlite_conn.commit()
-        return len(df)
+        log_sync_event(stats)
+        return count
         
     except Exception as e:
         print(f"Error syncing users: {str(e)}")
         sqlite_conn.rollback()
+        log_sync_event(stats, e)
         raise
     finally:
         source_conn.close()
         sqlite_conn.close()
 
-def sync_sessions(days_back=None, verbose=True):
-    """Sync ALL Sessions from HitTrax to SQLite"""
+def sync_sessions(days_back=None, incremental=False, batch_size=None, verbose=True, run_id=None):
+    """
+    Sync Sessions from HitTrax to SQLite
+
+    By default ALL sessions are copied. days_back limits the pull to recent
+    sessions and incremental pulls only rows past the stored watermark; both
+    upsert into the existing table instead of replacing it.
+    """
     if verbose:
-        print(f"\nSyncing {'all' if days_back is None else f'last {days_back} days of'} Sessions...")
+        if incremental:
+            print("\nSyncing new and changed Sessions...")
+        else:
+            print(f"\nSyncing {'all' if days_back is None else f'last {days_back} days of'} Sessions...")
     
-    source_conn = pymssql.connect(**HITTRAX_CONFIG['source_db'])
-    sqlite_conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    # Created first so a failure while planning the sync is still logged
+    stats = SyncStats('Session', sync_mode(incremental or days_back is not None, incremental), run_id)
+    source_conn = connect_source()
+    sqlite_conn = connect_sqlite()
     
     try:
-        base_query = """
-        SELECT 
-            Id, UnitId, UserId, UserUnitId, TimeStamp, Stadium, Type,
-            SkillLevel, GameType, MaxPitchVel, MaxExitVel, AvgPitchVel,
-            AvgExitVel, AvgElevation, AvgDistance, MaxDistance, PitchCount,
-            HitCount, Singles, Doubles, Triples, HomeRuns, FoulBalls,
-            Strikes, Balls, AVG, SLG, LDPercentage, FBPercentage,
-            GBPercentage, LIPercentage, RIPercentage, CIPercentage,
-            LOPercentage, ROPercentage, COPercentage, StrikeZoneBottom,
-            StrikeZoneTop, HHCount, HHVel, Active, StrikeZoneWidth,
-            MaxGroundDist, AvgGroundDist, Score, MaxPoints, AB, Video,
-            RankMaxVel, RankAvgVel, RankMaxDist, RankPoints, BatMaterial
-        FROM Session 
-        """
-        
-        params = None
-        if days_back is not None:
-            cutoff_date = datetime.now() - timedelta(days=days_back)
-            base_query += " WHERE TimeStamp >= %s"
-            params = (cutoff_date,)
+        base_query = SESSION_QUERY
+        
+        condition, params, upsert = build_sync_filter(sqlite_conn, 'Session', days_back, incremental)
+        if condition:
+            base_query += f" WHERE {condition}"
+        stats.mode = sync_mode(upsert, incremental)
             
+        # Sized before the main query: the connection can't run both at once
+        defer = should_defer_indexes(source_conn, 'Session', condition, params, upsert)
+
         if verbose:
             print("Fetching sessions from source database...")
             
-        df = pd.read_sql(base_query, source_conn, params=params)
+        source_cursor = source_conn.cursor()
+        source_cursor.execute(base_query, params)
         # Data comes in metric, no need to convert
         
-        df.to_sql('Session', sqlite_conn, if_exists='replace', index=False)
+        count = stream_rows(source_cursor, sqlite_conn, 'Session', upsert, batch_size, defer, stats=stats)
+        with stats.timer('index'):
+            update_player_daily(sqlite_conn, local_condition(condition), params, upsert)
+        update_sync_state(sqlite_conn, 'Session')
         
         if verbose:
-            print(f"Successfully synced {len(df)} sessions")
+            print(f"Successfully synced {count} sessions")
         
         sqlite_conn.commit()
-        return len(df)
+        log_sync_event(stats)
+        return count
         
     except Exception as e:
         print(f"Error syncing sessions: {str(e)}")
         sqlite_conn.rollback()
+        log_sync_event(stats, e)
         raise
     finally:
         source_conn.close()
         sqlite_conn.close()
 
-def sync_plays(days_back=None, verbose=True):
-    """Sync ALL Plays from HitTrax to SQLite"""
+def sync_plays(days_back=None, incremental=False, batch_size=None, verbose=True, run_id=None):
+    """
+    Sync Plays from HitTrax to SQLite
+
+    By default ALL plays are copied. days_back limits the pull to recent
+    plays and incremental pulls only rows past the stored watermark; both
+    upsert into the existing table instead of replacing it.
+    """
     if verbose:
-        print(f"\nSyncing {'all' if days_back is None else f'last {days_back} days of'} Plays...")
+        if incremental:
+            print("\nSyncing new and changed Plays...")
+        else:
+            print(f"\nSyncing {'all' if days_back is None else f'last {days_back} days of'} Plays...")
     
-    source_conn = pymssql.connect(**HITTRAX_CONFIG['source_db'])
-    sqlite_conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    # Created first so a failure while planning the sync is still logged
+    stats = SyncStats('Plays', sync_mode(incremental or days_back is not None, incremental), run_id)
+    source_conn = connect_source()
+    sqlite_conn = connect_sqlite()
     
     try:
-        base_query = """
-        SELECT 
-            Id, SessionId, TimeStamp, ExitBallVel1, ExitBallVel2,
-            ExitBallVel3, Distance, PitchVel, Result, Type, Fielder,
-            Quadrant, PosStart1, PosStart2, PosStart3, PosEnd1, PosEnd2,
-            PosEnd3, PosPitch1, PosPitch2, PosPitch3, PosCaught1,
-            PosCaught2, PosCaught3, PitchType, PitchCoeffs1, PitchCoeffs2,
-            PitchCoeffs3, PitchCoeffs4, PitchCoeffs5, PitchCoeffs6,
-            PitchBreakH, PitchBreakV, Elevation, PitchBreakVG, Ms,
-            GroundDist, Active, Intersect1, Intersect2, Intersect3,
-            PitchAngle, HorizontalAngle, ExitVelo, Points
-        FROM Plays 
-        """
-        
-        params = None
-        if days_back is not None:
-            cutoff_date = datetime.now() - timedelta(days=days_back)
-            base_query += " WHERE TimeStamp >= %s"
-            params = (cutoff_date,)
+        base_query = PLAYS_QUERY
+        
+        condition, params, upsert = build_sync_filter(sqlite_conn, 'Plays', days_back, incremental)
+        if condition:
+            base_query += f" WHERE {condition}"
+        stats.mode = sync_mode(upsert, incremental)
             
+        # Sized before the main query: the connection can't run both at once
+        defer = should_defer_indexes(source_conn, 'Plays', condition, params, upsert)
+
         if verbose:
             print("Fetching plays from source database...")
             
-        df = pd.read_sql(base_query, source_conn, params=params)
+        source_cursor = source_conn.cursor()
+        source_cursor.execute(base_query, params)
         # Data comes in metric, no need to convert
         
-        df.to_sql('Plays', sqlite_conn, if_exists='replace', index=False)
+        count = stream_rows(source_cursor, sqlite_conn, 'Plays', upsert, batch_size, defer, stats=stats)
+        with stats.timer('index'):
+            update_play_arrays(sqlite_conn, local_condition(condition), params, upsert)
+        update_sync_state(sqlite_conn, 'Plays')
         
         if verbose:
-            print(f"Successfully synced {len(df)} plays")
+            print(f"Successfully synced {count} plays")
         
         sqlite_conn.commit()
-        return len(df)
+        log_sync_event(stats)
+        return count
         
     except Exception as e:
         print(f"Error syncing plays: {str(e)}")
         sqlite_conn.rollback()
+        log_sync_event(stats, e)
         raise
     finally:
         source_conn.close()
         sqlite_conn.close()
 
-def sync_all(days_back=None):
-    """Run full synchronization"""
-    print("Starting full sync...")
-    print("Note: This will sync ALL historical data and may take a while...")
-    
-    if not test_source_connection():
-        print("Failed to connect to source database. Aborting sync.")
-        return
-    
+def sync_mode(upsert, incremental, parallel=False):
+    """Label a table load for SyncLog"""
+    mode = 'full' if not upsert else 'incremental' if incremental else 'days_back'
+    return f"parallel_{mode}" if parallel else mode
+
+def plan_id_ranges(source_conn, table, condition, params, partitions):
+    """Split the source rows matching `condition` into contiguous, roughly equal Id ranges"""
+    query = f"SELECT MIN(Id), MAX(Id) FROM {table}"
+    if condition:
+        query += f" WHERE {condition}"
+    cursor = source_conn.cursor()
+    cursor.execute(query, params)
+    min_id, max_id = cursor.fetchone()
+    if min_id is None:
+        return []
+
+    step = max(1, (max_id - min_id + partitions) // partitions)
+    return [(low, min(low + step - 1, max_id)) for low in range(min_id, max_id + 1, step)]
+
+def fetch_partition(job, batch_queue, batch_size, stop_event, stats):
+    """
+    Worker: pull one table or Id range over its own source connection.
+
+    Each batch is handed to the writer through a bounded queue, so producers
+    block instead of buffering when SQLite falls behind.
+    """
+    table, query, params = job
     try:
-        users_count = sync_users()
-        sessions_count = sync_sessions(days_back)
-        plays_count = sync_plays(days_back)
-        
-        print("\nSync complete!")
-        print(f"Synced:")
-        print(f"- {users_count:,} users")
-        print(f"- {sessions_count:,} sessions")
-        print(f"- {plays_count:,} plays")
-        
-        verify_data()
-        
+        source_conn = connect_source()
+        try:
+            cursor = source_conn.cursor()
+            with stats.timer('fetch'):
+                cursor.execute(query, params)
+            columns = [col[0] for col in cursor.description]
+            while not stop_event.is_set():
+                with stats.timer('fetch'):
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                stats.add_batch(rows)
+                batch_queue.put((table, columns, rows))
+        finally:
+            source_conn.close()
+        batch_queue.put((table, None, None))
     except Exception as e:
-        print(f"Error during sync: {str(e)}")
-        
+        batch_queue.put((table, None, e))
+
+def sync_parallel(days_back=None, incremental=False, batch_size=None, workers=None, verbose=True,
+                  run_id=None):
+    """
+    Sync Users, Session and Plays concurrently
+
+    Each table is fetched on its own source connection and Plays is further
+    split into Id ranges pulled by a thread pool. The calling thread is the
+    only SQLite writer: it drains the batch queue and applies every insert
+    inside a single transaction. Returns a dict of row counts per table.
+    Fetch time in SyncLog is summed across workers, so it can exceed the
+    wall-clock total.
+    """
+    batch_size = batch_size or DB_CONFIG['batch_size']
+    workers = workers or DB_CONFIG['sync_workers']
+    if verbose:
+        print(f"\nSyncing Users, Session and Plays in parallel ({workers} workers)...")
+
+    source_conn = connect_source()
+    sqlite_conn = connect_sqlite()
+    stop_event = threading.Event()
+    run_id = run_id or new_run_id()
+    stats = {}
+
+    try:
+        jobs = []
+        upserts = {}
+        filters = {}
+        deferred = []
+        for table, query in SYNC_QUERIES.items():
+            if table == 'Users':
+                condition, params, upsert = None, None, False
+            else:
+                condition, params, upsert = build_sync_filter(sqlite_conn, table, days_back, incremental)
+            upserts[table] = upsert
+            filters[table] = (condition, params)
+            stats[table] = SyncStats(table, sync_mode(upsert, incremental, parallel=True), run_id)
+            if should_defer_indexes(source_conn, table, condition, params, upsert):
+                deferred.append(table)
+
+            if table == 'Plays':
+                for low, high in plan_id_ranges(source_conn, table, condition, params, workers):
+                    range_condition = f"{condition} AND Id BETWEEN %s AND %s" if condition else "Id BETWEEN %s AND %s"
+                    jobs.append((table, f"{query} WHERE {range_condition}", tuple(params or ()) + (low, high)))
+            else:
+                jobs.append((table, f"{query} WHERE {condition}" if condition else query, params))
+        source_conn.close()
+
+        if verbose:
+            print(f"Fetching {len(jobs)} partitions from source database...")
+
+        # Full loads go into staging tables and are swapped in together at the
+        # end; large upserts load without secondary indexes
+        sqlite_conn.execute('BEGIN')
+        for table, upsert in upserts.items():
+            if not upsert:
+                create_staging_table(sqlite_conn, table)
+        for table in deferred:
+            drop_indexes(sqlite_conn, table)
+
+        counts = {table: 0 for table in SYNC_QUERIES}
+        batch_queue = queue.Queue(maxsize=workers * 2)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fetch_partition, job, batch_queue, batch_size, stop_event, stats[job[0]])
+                       for job in jobs]
+
+            try:
+                remaining = len(jobs)
+                while remaining:
+                    table, columns, rows = batch_queue.get()
+                    if columns is None:
+                        if isinstance(rows, Exception):
+                            raise rows
+                        remaining -= 1
+                        continue
+                    with stats[table].timer('write'):
+                        insert_rows(sqlite_conn, table, columns, rows, upserts[table], staging=not upserts[table])
+                    counts[table] += len(rows)
+            except BaseException:
+                # Cancel queued partitions and keep draining so producers blocked
+                # on a full queue can finish before the pool shuts down
+                stop_event.set()
+                for future in futures:
+                    future.cancel()
+                while not all(future.done() for future in futures):
+                    try:
+                        batch_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                raise
+
+        # Swapping table by table keeps the index timings separate; it is
+        # still one transaction, so readers see all tables change at once
+        for table, upsert in upserts.items():
+            with stats[table].timer('index'):
+                if not upsert:
+                    swap_in_staging_tables(sqlite_conn, [table])
+                    continue
+                if table in deferred:
+                    create_indexes(sqlite_conn, table)
+                if counts[table]:
+                    analyze_table(sqlite_conn, table)
+        with stats['Users'].timer('index'):
+            seed_grad_year_overrides(sqlite_conn)
+            refresh_grad_years(sqlite_conn)
+        with stats['Session'].timer('index'):
+            condition, params = filters['Session']
+            update_player_daily(sqlite_conn, local_condition(condition), params, upserts['Session'])
+        with stats['Plays'].timer('index'):
+            condition, params = filters['Plays']
+            update_play_arrays(sqlite_conn, local_condition(condition), params, upserts['Plays'])
+        update_sync_state(sqlite_conn, 'Session')
+        update_sync_state(sqlite_conn, 'Plays')
+        sqlite_conn.commit()
+        for table_stats in stats.values():
+            log_sync_event(table_stats)
+
+        if verbose:
+            for table, count in counts.items():
+                print(f"Successfully synced {count} rows into {table}")
+        return counts
+
+    except Exception as e:
+        print(f"Error during parallel sync: {str(e)}")
+        sqlite_conn.rollback()
+        for table_stats in stats.values():
+            log_sync_event(table_stats, e)
+        raise
+    finally:
+        source_conn.close()
+        sqlite_conn.close()
+
 def test_source_connection():
     """Test connection to source HitTrax database"""
     try:
         print("Testing connection to HitTrax database...")
-        conn = pymssql.connect(**HITTRAX_CONFIG['source_db'])
+        conn = connect_source()
         cursor = conn.cursor()
         
         # Test query
@@ -192,25 +592,67 @@ def test_source_connection():
         print(f"Error connecting to HitTrax database: {str(e)}")
         return False
 
-def sync_all(days_back=None):
-    """Run full synchronization"""
-    print("Starting full sync...")
-    print("Note: This will sync ALL historical data and may take a while...")
+def sync_all(days_back=None, incremental=False, batch_size=None, parallel=False, workers=None,
+             raise_errors=False):
+    """
+    Run synchronization
+
+    incremental=True only transfers Sessions and Plays past the watermarks
+    stored in SyncState; Users is small and always copied in full.
+    parallel=True fetches all tables concurrently (see sync_parallel).
+    Afterwards the post-sync maintenance in maintenance.py runs unless
+    DB_CONFIG['maintenance_after_sync'] is off. Returns the row counts per
+    table. Errors are printed, and re-raised when raise_errors is set.
+    """
+    if incremental:
+        print("Starting incremental sync...")
+    else:
+        print("Starting full sync...")
+        print("Note: This will sync ALL historical data and may take a while...")
     
     try:
-        users_count = sync_users()
-        sessions_count = sync_sessions(days_back)
-        plays_count = sync_plays(days_back)
+        # Make sure the typed tables and SyncState exist before writing
+        create_sqlite_schema()
+
+        run_id = new_run_id()
+        if parallel:
+            counts = sync_parallel(days_back, incremental, batch_size, workers, run_id=run_id)
+            users_count, sessions_count, plays_count = counts['Users'], counts['Session'], counts['Plays']
+        else:
+            users_count = sync_users(batch_size, run_id=run_id)
+            sessions_count = sync_sessions(days_back, incremental, batch_size, run_id=run_id)
+            plays_count = sync_plays(days_back, incremental, batch_size, run_id=run_id)
         
         print("\nSync complete!")
         print(f"Synced:")
         print(f"- {users_count:,} users")
         print(f"- {sessions_count:,} sessions")
         print(f"- {plays_count:,} plays")
+
+        if DB_CONFIG['maintenance_after_sync']:
+            print("\nRunning database maintenance...")
+            run_maintenance(run_id)
+
+        return {'Users': users_count, 'Session': sessions_count, 'Plays': plays_count}
         
     except Exception as e:
         print(f"Error during sync: {str(e)}")
+        if raise_errors:
+            raise
 
 if __name__ == "__main__":
-    # Sync ALL historical data
-    sync_all(days_back=None)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync HitTrax data into the local SQLite database")
+    parser.add_argument('--days-back', type=int, default=None,
+                        help="Only sync sessions and plays from the last N days")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only sync rows added or changed since the last sync")
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help="Rows fetched and written per batch (default: DB_CONFIG['batch_size'])")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Fetch tables and Plays Id ranges concurrently")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Source connections used by --parallel (default: DB_CONFIG['sync_workers'])")
+    args = parser.parse_args()
+
+    sync_all(days_back=args.days_back, incremental=args.incremental, batch_size=args.batch_size,
+             parallel=args.parallel, workers=args.workers)
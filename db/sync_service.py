@@ -0,0 +1,110 @@
+# sync_service.py
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+from config import HITTRAX_CONFIG, DB_CONFIG
+from schema import create_sqlite_schema
+from sync import connect_source, sync_all
+
+PROBED_TABLES = ['Users', 'Session', 'Plays']
+
+def probe_source():
+    """
+    Cheap change detection: row count and max Id of each synced table.
+
+    New rows move MAX(Id) and deletes move COUNT(*); both are answered from
+    the primary key without reading row data.
+    """
+    conn = connect_source()
+    try:
+        cursor = conn.cursor()
+        probe = {}
+        for table in PROBED_TABLES:
+            cursor.execute(f"SELECT COUNT(*), MAX(Id) FROM {table}")
+            probe[table] = tuple(cursor.fetchone())
+        return probe
+    finally:
+        conn.close()
+
+def record_status(status, **fields):
+    """Upsert the single SyncStatus row read by the dashboard"""
+    fields['Status'] = status
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    try:
+        conn.execute("INSERT OR IGNORE INTO SyncStatus (Id, Status) VALUES (1, ?)", (status,))
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        conn.execute(f"UPDATE SyncStatus SET {assignments} WHERE Id = 1", tuple(fields.values()))
+        conn.commit()
+    finally:
+        conn.close()
+
+def timestamp():
+    return datetime.now().isoformat(' ', 'seconds')
+
+def run_sync_service(poll_interval=None, sync_interval=None, parallel=False):
+    """
+    Poll the source and run an incremental sync whenever something moved
+
+    The source is probed every poll_interval seconds. A transfer runs when
+    the probe differs from the last successful one, or at least every
+    sync_interval seconds so edits that don't change counts are still picked
+    up by the incremental lookback window. Runs until interrupted.
+    """
+    poll_interval = poll_interval or DB_CONFIG['poll_interval']
+    sync_interval = sync_interval or DB_CONFIG['sync_interval']
+    print(f"Starting sync service (polling every {poll_interval}s, full check every {sync_interval}s)...")
+
+    create_sqlite_schema()
+    last_probe = None
+    last_sync = 0.0
+
+    while True:
+        try:
+            probe = probe_source()
+        except Exception as e:
+            print(f"Error probing source database: {str(e)}")
+            record_status('unreachable', LastChecked=timestamp(), LastError=str(e))
+            time.sleep(poll_interval)
+            continue
+
+        if probe == last_probe and time.time() - last_sync < sync_interval:
+            record_status('idle', LastChecked=timestamp())
+        else:
+            started = time.time()
+            record_status('syncing', LastChecked=timestamp(), LastSyncStarted=timestamp())
+            try:
+                counts = sync_all(incremental=True, parallel=parallel, raise_errors=True)
+                record_status(
+                    'ok',
+                    LastSyncFinished=timestamp(),
+                    LastSyncSeconds=round(time.time() - started, 2),
+                    LastSyncRows=sum(counts.values()),
+                    LastError=None
+                )
+                last_probe = probe
+                last_sync = time.time()
+            except Exception as e:
+                record_status(
+                    'error',
+                    LastSyncFinished=timestamp(),
+                    LastSyncSeconds=round(time.time() - started, 2),
+                    LastError=str(e)
+                )
+
+        time.sleep(poll_interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the local database in sync with HitTrax")
+    parser.add_argument('--poll-interval', type=int, default=None,
+                        help="Seconds between source probes (default: DB_CONFIG['poll_interval'])")
+    parser.add_argument('--sync-interval', type=int, default=None,
+                        help="Maximum seconds between syncs (default: DB_CONFIG['sync_interval'])")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Use the parallel sync mode for each transfer")
+    args = parser.parse_args()
+
+    try:
+        run_sync_service(args.poll_interval, args.sync_interval, args.parallel)
+    except KeyboardInterrupt:
+        print("\nSync service stopped")
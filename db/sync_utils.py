@@ -0,0 +1,123 @@
+# sync_utils.py
+import argparse
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from config import HITTRAX_CONFIG
+from schema import SYNC_LOG_TABLE
+
+def new_run_id():
+    """Identify one sync run; every table synced by it shares the id"""
+    return datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+
+def estimate_row_bytes(row):
+    """Approximate payload size of a fetched row (text by length, numbers as 8 bytes)"""
+    return sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in row)
+
+class SyncStats:
+    """Per-table timings and volumes for one sync run, safe to update from worker threads"""
+
+    def __init__(self, table, mode, run_id=None):
+        self.table = table
+        self.mode = mode
+        self.run_id = run_id or new_run_id()
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.seconds = {'fetch': 0.0, 'write': 0.0, 'index': 0.0}
+        self.rows = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds, rows=0, bytes=0):
+        with self._lock:
+            self.seconds[phase] += seconds
+            self.rows += rows
+            self.bytes += bytes
+
+    def add_batch(self, rows):
+        """Count a fetched batch; its size is estimated from the first row"""
+        with self._lock:
+            self.rows += len(rows)
+            self.bytes += estimate_row_bytes(rows[0]) * len(rows) if rows else 0
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+def log_sync_event(stats, error=None):
+    """Record one table's sync telemetry in the SyncLog table"""
+    total = time.perf_counter() - stats.started
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    try:
+        conn.execute(SYNC_LOG_TABLE)
+        conn.execute(
+            """
+            INSERT INTO SyncLog (RunId, TableName, Mode, StartedAt, FetchSeconds, WriteSeconds,
+                                 IndexSeconds, TotalSeconds, Rows, Bytes, RowsPerSec, Error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (stats.run_id, stats.table, stats.mode, stats.started_at.isoformat(' ', 'seconds'),
+             round(stats.seconds['fetch'], 3), round(stats.seconds['write'], 3),
+             round(stats.seconds['index'], 3), round(total, 3), stats.rows, stats.bytes,
+             round(stats.rows / total, 1) if total > 0 else None, str(error) if error else None)
+        )
+        conn.commit()
+    except Exception as e:
+        # Telemetry must never fail a sync
+        print(f"Error logging sync event: {str(e)}")
+    finally:
+        conn.close()
+
+def print_sync_report(limit=20, table=None):
+    """Print recent runs per table and how the latest throughput compares to the previous ones"""
+    conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    try:
+        query = "SELECT * FROM SyncLog"
+        params = ()
+        if table:
+            query += " WHERE TableName = ?"
+            params = (table,)
+        query += " ORDER BY Id DESC LIMIT ?"
+        rows = conn.execute(query, params + (limit,)).fetchall()
+        columns = [col[0] for col in conn.execute("SELECT * FROM SyncLog LIMIT 0").description]
+    except sqlite3.OperationalError:
+        print("No sync runs have been logged yet")
+        return
+    finally:
+        conn.close()
+
+    runs = [dict(zip(columns, row)) for row in rows]
+    print(f"\n{'Started':<20} {'Table':<8} {'Mode':<12} {'Rows':>10} {'MB':>8} "
+          f"{'Fetch s':>8} {'Write s':>8} {'Index s':>8} {'Rows/s':>10}  Error")
+    for run in runs:
+        print(f"{run['StartedAt']:<20} {run['TableName']:<8} {run['Mode']:<12} {run['Rows']:>10,} "
+              f"{run['Bytes'] / 1e6:>8.1f} {run['FetchSeconds']:>8.2f} {run['WriteSeconds']:>8.2f} "
+              f"{run['IndexSeconds']:>8.2f} {run['RowsPerSec'] or 0:>10,.0f}  {run['Error'] or ''}")
+
+    print("\nThroughput trend (latest vs. average of earlier runs of the same mode):")
+    for name in sorted({run['TableName'] for run in runs}):
+        table_runs = [run for run in runs if run['TableName'] == name and run['RowsPerSec'] and not run['Error']]
+        if not table_runs:
+            continue
+        latest = table_runs[0]
+        earlier = [run['RowsPerSec'] for run in table_runs[1:] if run['Mode'] == latest['Mode']]
+        if earlier:
+            baseline = sum(earlier) / len(earlier)
+            change = (latest['RowsPerSec'] - baseline) / baseline * 100
+            print(f"- {name} ({latest['Mode']}): {latest['RowsPerSec']:,.0f} rows/s, {change:+.0f}% vs {baseline:,.0f}")
+        else:
+            print(f"- {name} ({latest['Mode']}): {latest['RowsPerSec']:,.0f} rows/s (no earlier runs)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show sync telemetry from the SyncLog table")
+    parser.add_argument('--limit', type=int, default=20, help="Number of recent table runs to show")
+    parser.add_argument('--table', choices=['Users', 'Session', 'Plays'], default=None)
+    args = parser.parse_args()
+
+    print_sync_report(args.limit, args.table)
@@ -1,7 +1,11 @@
 # db_utils.py
-import sqlite3
+from importlib.util import find_spec
+import numpy as np
 import pandas as pd
-from config import HITTRAX_CONFIG
+from config import DATAFRAME_CONFIG
+from connection_pool import get_read_connection, read_pool
+from db.rollup import DAILY_STATS
+from query_cache import cached_fetchall, cached_read_sql, query_cache
 
 # Column grouping definitions
 COLUMN_GROUPS = {
@@ -32,7 +36,8 @@ COLUMN_FORMATS = {
     },
     'average': {
         'columns': ['AvgDistanceFeet', 'AvgGroundDistFeet', 'LDPercentage', 'FBPercentage', 
-                   'GBPercentage', 'LOPercentage'],
+                   'GBPercentage', 'LIPercentage', 'RIPercentage', 'CIPercentage', 'LOPercentage',
+                   'ROPercentage', 'COPercentage', 'RankMaxVel', 'RankAvgVel', 'RankMaxDist', 'RankPoints'],
         'tooltip': COLUMN_TOOLTIPS['average']
     },
     'total': {
@@ -46,99 +51,314 @@ COLUMN_FORMATS = {
     }
 }
 
+# How each COLUMN_FORMATS kind combines a player's PlayerDaily rows (alias d;
+# see DAILY_STATS in db/rollup.py): the best day, the mean over sessions,
+# the sum, or the AB-weighted mean SUM(AB x value) / SUM(AB)
+FORMAT_AGGREGATES = {
+    'best': 'MAX(d.{col})',
+    'average': 'SUM(d.Sum{col}) / SUM(d.Sessions)',
+    'total': 'SUM(d.{col})',
+    'weighted_avg': 'SUM(d.ABx{col}) / SUM(d.AB)'
+}
+
+def check_rollup_columns():
+    """Raise if a COLUMN_FORMATS column has no PlayerDaily column for its kind's aggregate"""
+    missing = [f"{col} ({kind})" for kind, config in COLUMN_FORMATS.items()
+               for col in config['columns'] if col not in DAILY_STATS.get(kind, [])]
+    if missing:
+        raise ValueError(f"COLUMN_FORMATS columns missing from rollup.DAILY_STATS: {', '.join(missing)}")
+
+check_rollup_columns()
+
+# Per-player aggregates available to get_player_stats: every COLUMN_FORMATS
+# column, compiled from its kind, plus the number of sessions
+PLAYER_STAT_AGGREGATES = {
+    'AB': 'SUM(d.AB)',
+    'Sessions': 'SUM(d.Sessions)',
+    **{col: FORMAT_AGGREGATES[kind].format(col=col)
+       for kind, config in COLUMN_FORMATS.items() for col in config['columns']}
+}
+
+def account_filters(grad_years=None, players=None):
+    """
+    WHERE conditions and params restricting UsersConverted (alias u) to graduation years and full names
+
+    Graduation years are the EffectiveGradYear the leaderboards use, so
+    overrides (db/grad_years.py) apply here too.
+    """
+    conditions, params = [], []
+    if grad_years:
+        conditions.append(f"u.EffectiveGradYear IN ({', '.join('?' * len(grad_years))})")
+        params.extend(int(year) for year in grad_years)
+    if players:
+        conditions.append(f"u.FullName IN ({', '.join('?' * len(players))})")
+        params.extend(' '.join(str(name).split()) for name in players)
+    return conditions, params
+
+def build_player_stats_query(min_ab=10, grad_years=None, players=None, start_date=None, end_date=None,
+                             aggregates=None):
+    """
+    Compile player summary filters into one GROUP BY ... HAVING query over PlayerDaily
+
+    grad_years and players (full names) restrict the accounts, start_date /
+    end_date ('YYYY-MM-DD', inclusive) the days, and min_ab the players'
+    total at-bats in that window. aggregates picks PLAYER_STAT_AGGREGATES
+    columns (default: all). Returns (sql, params), one row per account.
+    """
+    aggregates = list(aggregates or PLAYER_STAT_AGGREGATES)
+    unknown = [name for name in aggregates if name not in PLAYER_STAT_AGGREGATES]
+    if unknown:
+        raise ValueError(f"Unknown player stat aggregates: {', '.join(unknown)}")
+
+    conditions, params = account_filters(grad_years, players)
+    if start_date:
+        conditions.append("d.Day >= ?")
+        params.append(str(start_date)[:10])
+    if end_date:
+        conditions.append("d.Day <= ?")
+        params.append(str(end_date)[:10])
+
+    columns = ',\n        '.join(f"{PLAYER_STAT_AGGREGATES[name]} as {name}" for name in aggregates)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # One row per account, so a row maps to exactly one UserId
+    query = f"""
+    SELECT
+        u.Id as UserId,
+        u.FullName as Name,
+        u.EffectiveGradYear as GraduationYear,
+        {columns}
+    FROM PlayerDaily d
+    JOIN UsersConverted u ON d.UserId = u.Id
+    {where}
+    GROUP BY u.Id
+    HAVING SUM(d.AB) >= ?
+    """
+    return query, tuple(params) + (min_ab,)
+
+# Account fields get_player_details can return next to the SessionConverted columns
+PLAYER_DETAIL_USER_COLUMNS = {
+    'Name': 'u.FullName',
+    'School': 'u.School',
+    'GraduationYear': 'u.EffectiveGradYear',
+    'Height': 'u.HeightFeet',
+    'Weight': 'u.WeightLbs'
+}
+
+# What the session details view loads: the session time and the COLUMN_GROUPS columns
+PLAYER_DETAIL_COLUMNS = ['TimeStamp'] + [col for group in COLUMN_GROUPS.values() for col in group]
+
+# Repeated text stored as pandas categoricals by compact_frame
+CATEGORY_COLUMNS = ['Name', 'School']
+
+# Integer columns that can be NULL; read_sql returns them as float64
+NULLABLE_INTEGER_COLUMNS = ['GraduationYear', 'EffectiveGradYear']
+
+ARROW_AVAILABLE = find_spec('pyarrow') is not None
+
+def compact_frame(df):
+    """
+    Replace pandas' object/float64/int64 defaults with compact dtypes
+
+    CATEGORY_COLUMNS become categoricals, floats float32 and integers the
+    smallest int type that holds their values. NULLABLE_INTEGER_COLUMNS get
+    the matching nullable type (e.g. Int16), so a missing graduation year
+    doesn't turn 2027 into 2027.0. With DATAFRAME_CONFIG['arrow'] (and
+    pyarrow installed) the columns are then Arrow-backed.
+    """
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in NULLABLE_INTEGER_COLUMNS:
+            smallest = pd.to_numeric(df[col].dropna().astype('int64'), downcast='integer').dtype
+            df[col] = df[col].astype(smallest.name.capitalize())
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype('float32')
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    if DATAFRAME_CONFIG['arrow'] and ARROW_AVAILABLE:
+        df = df.convert_dtypes(dtype_backend='pyarrow')
+    return df
+
+def frame_records(df, decimals=4):
+    """
+    df.to_dict('records') for a table, with float32 values rounded instead
+    of showing their binary noise and missing nullable integers as None
+    """
+    floats = {col: 'float64' for col in df.columns if pd.api.types.is_float_dtype(df[col])}
+    df = df.astype(floats).round(decimals)
+    for col in df.columns:
+        if pd.api.types.is_extension_array_dtype(df[col]) and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df.to_dict('records')
+
+def decode_play_arrays(data, rows, layout):
+    """
+    One PlayArrays blob as {column: NumPy array}
+
+    The arrays are read-only views into the blob, so nothing is copied.
+    layout is the (Name, Dtype) list stored in PlayArrayLayout.
+    """
+    arrays = {}
+    offset = 0
+    for name, dtype in layout:
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=rows, offset=offset)
+        offset += rows * np.dtype(dtype).itemsize
+    return arrays
+
 
 class DatabaseManager:
     """Centralized database management class"""
     
     @staticmethod
     def get_connection():
-        """Create a connection to the SQLite database"""
+        """This thread's pooled, read-only connection to the SQLite database (see connection_pool.py)"""
         try:
-            conn = sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
-            return conn
+            return get_read_connection()
         except Exception as e:
             print(f"Error connecting to database: {str(e)}")
             raise
 
     @staticmethod
-    def get_hittrax_data():
-        """Get all HitTrax data from SQLite database"""
+    def get_player_stats(min_ab=10, grad_years=None, players=None, start_date=None, end_date=None,
+                         aggregates=None):
+        """
+        Get per-player summary stats from the PlayerDaily rollup (cached until the data changes)
+
+        All filters run in SQL (see build_player_stats_query), so only the
+        qualifying players' rows are returned.
+        """
         try:
-            conn = DatabaseManager.get_connection()
+            query, params = build_player_stats_query(min_ab, grad_years, players, start_date, end_date, aggregates)
+            stats = cached_read_sql(query, params, transform=compact_frame)
+            return stats
             
-            query = """
+        except Exception as e:
+            print(f"Error getting player stats: {str(e)}")
+            return pd.DataFrame()
+
+    @staticmethod
+    def get_player_details(user_id, columns=None):
+        """
+        Get detailed session data for one player, newest first (cached until the data changes)
+
+        columns picks SessionConverted and PLAYER_DETAIL_USER_COLUMNS columns
+        (default: all of them); names that are neither are skipped. The result
+        has compact dtypes, see compact_frame.
+        """
+        try:
+            if columns:
+                session_columns = {row[0] for row in cached_fetchall("SELECT name FROM pragma_table_info('SessionConverted')")}
+                select = ',\n                '.join(
+                    f"{PLAYER_DETAIL_USER_COLUMNS[col]} as {col}" if col in PLAYER_DETAIL_USER_COLUMNS else f"s.{col}"
+                    for col in dict.fromkeys(columns)
+                    if col in PLAYER_DETAIL_USER_COLUMNS or col in session_columns
+                )
+                if not select:
+                    raise ValueError(f"None of the columns {', '.join(map(str, columns))} exist")
+            else:
+                select = ',\n                '.join(
+                    ['s.*'] + [f"{expr} as {col}" for col, expr in PLAYER_DETAIL_USER_COLUMNS.items()]
+                )
+            query = f"""
             SELECT 
-                s.*,
-                u.FirstName,
-                u.LastName,
-                u.FirstName || ' ' || u.LastName as Name,
-                u.School,
-                u.HeightFeet as Height,
-                u.WeightLbs as Weight,
-                u.GraduationYear
+                {select}
             FROM SessionConverted s
-            LEFT JOIN UsersConverted u ON s.UserId = u.Id
-            WHERE s.Active = 1
+            JOIN UsersConverted u ON s.UserId = u.Id
+            WHERE s.UserId = ?
+            ORDER BY s.TimeStamp DESC
             """
             
-            df = pd.read_sql(query, conn)
-            conn.close()
+            df = cached_read_sql(query, (int(user_id),), transform=compact_frame)
             return df
             
         except Exception as e:
-            print(f"Error querying SQLite database: {str(e)}")
+            print(f"Error getting player details: {str(e)}")
             return pd.DataFrame()
 
     @staticmethod
-    def calculate_player_stats(df, min_ab=10):
-        """Calculate player statistics from session data"""
+    def get_session_play_arrays(session_id):
+        """
+        Get one session's plays as NumPy column arrays (raw metric units, by Id)
+
+        Returns None when the session has no arrays, e.g. because
+        DB_CONFIG['play_arrays'] is off; query PlaysConverted instead.
+        """
         try:
-            if df.empty:
-                return pd.DataFrame()
-                
-            stats = df.groupby(['Name', 'GraduationYear']).agg({
-                'AB': 'sum',
-                'MaxExitVelMph': 'max',
-                'AvgExitVelMph': 'mean',
-                'MaxDistanceFeet': 'max',
-                'AVG': 'mean',
-                'SLG': 'mean',
-                'HomeRuns': 'sum',
-                'HitCount': 'sum'
-            }).reset_index()
-            
-            stats = stats[stats['AB'] >= min_ab]
-            return stats
+            conn = DatabaseManager.get_connection()
+            
+            layout = conn.execute("SELECT Name, Dtype FROM PlayArrayLayout ORDER BY Position").fetchall()
+            row = conn.execute("SELECT Rows, Data FROM PlayArrays WHERE SessionId = ?", (int(session_id),)).fetchone()
+            return decode_play_arrays(row[1], row[0], layout) if row and layout else None
             
         except Exception as e:
-            print(f"Error calculating player stats: {str(e)}")
-            return pd.DataFrame()
+            print(f"Error getting play arrays: {str(e)}")
+            return None
 
     @staticmethod
-    def get_player_details(player_name):
-        """Get detailed session data for a specific player"""
+    def get_player_play_arrays(user_id):
+        """
+        Get all of a player's plays as NumPy column arrays, session by session
+
+        Adds a SessionId array alongside the stored columns. Returns None
+        when the player has no arrays (see get_session_play_arrays).
+        """
         try:
             conn = DatabaseManager.get_connection()
             
-            query = """
-            SELECT 
-                s.*,
-                u.FirstName || ' ' || u.LastName as Name,
-                u.School,
-                u.HeightFeet as Height,
-                u.WeightLbs as Weight
-            FROM SessionConverted s
-            LEFT JOIN UsersConverted u ON s.UserId = u.Id
-            WHERE u.FirstName || ' ' || u.LastName = ?
-            ORDER BY s.TimeStamp DESC
-            """
+            layout = conn.execute("SELECT Name, Dtype FROM PlayArrayLayout ORDER BY Position").fetchall()
+            rows = conn.execute("""
+                SELECT a.SessionId, a.Rows, a.Data
+                FROM Session s
+                JOIN PlayArrays a ON a.SessionId = s.Id
+                WHERE s.UserId = ?
+                ORDER BY s.Id
+            """, (int(user_id),)).fetchall()
+            if not rows or not layout:
+                return None
             
-            df = pd.read_sql(query, conn, params=(player_name,))
-            conn.close()
-            return df
+            sessions = [decode_play_arrays(data, count, layout) for _, count, data in rows]
+            arrays = {name: np.concatenate([session[name] for session in sessions]) for name, _ in layout}
+            arrays['SessionId'] = np.repeat([session_id for session_id, _, _ in rows], [count for _, count, _ in rows])
+            return arrays
             
         except Exception as e:
-            print(f"Error getting player details: {str(e)}")
+            print(f"Error getting play arrays: {str(e)}")
+            return None
+
+    @staticmethod
+    def get_connection_stats():
+        """Reuse counters of the pooled read connections: open, opened, reused, hit_rate"""
+        return read_pool.stats()
+
+    @staticmethod
+    def get_cache_stats():
+        """Counters of the query result cache: entries, bytes, hits, misses, hit_rate"""
+        return query_cache.stats()
+
+    @staticmethod
+    def get_sync_status():
+        """Get the background sync service's last check and transfer, or None"""
+        try:
+            conn = DatabaseManager.get_connection()
+            
+            status = pd.read_sql("SELECT * FROM SyncStatus WHERE Id = 1", conn)
+            return status.iloc[0].to_dict() if not status.empty else None
+            
+        except Exception as e:
+            print(f"Error getting sync status: {str(e)}")
+            return None
+
+    @staticmethod
+    def get_sync_log(limit=200):
+        """Get the most recent per-table sync runs recorded in SyncLog"""
+        try:
+            conn = DatabaseManager.get_connection()
+            
+            log = pd.read_sql("SELECT * FROM SyncLog ORDER BY Id DESC LIMIT ?", conn, params=(limit,))
+            return log
+            
+        except Exception as e:
+            print(f"Error getting sync log: {str(e)}")
             return pd.DataFrame()
 
     @staticmethod
@@ -162,7 +382,6 @@ class DatabaseManager:
                 count = pd.read_sql(f"SELECT COUNT(*) as count FROM {table}", conn)['count'][0]
                 print(f"\n{table} count: {count:,}")
             
-            conn.close()
             print("\n=== Verification Complete ===")
             
         except Exception as e:
@@ -217,4 +217,42 @@ def create_session_details_layout():
                 ]
             )
         ])
-    ])
\ No newline at end of file
+    ])
+
+def create_sync_status_bar():
+    """Status line for the background sync service, refreshed every minute"""
+    return html.Div([
+        html.Div(id='sync-status', style={'fontSize': '0.9em', 'color': '#666'}),
+        dcc.Interval(id='sync-status-interval', interval=60 * 1000)
+    ], style={'textAlign': 'center', 'marginBottom': '10px'})
+
+def create_sync_log_tab():
+    """Read connection reuse, the sync throughput trend and the most recent runs from SyncLog"""
+    return html.Div([
+        html.Div(id='connection-pool-stats', style={'fontSize': '0.9em', 'color': '#666'}),
+        dcc.Graph(id='sync-throughput-graph'),
+        dash_table.DataTable(
+            id='sync-log-table',
+            columns=[
+                {'name': name, 'id': column} for column, name in [
+                    ('StartedAt', 'Started'), ('TableName', 'Table'), ('Mode', 'Mode'),
+                    ('Rows', 'Rows'), ('FetchSeconds', 'Fetch (s)'), ('WriteSeconds', 'Write (s)'),
+                    ('IndexSeconds', 'Index (s)'), ('TotalSeconds', 'Total (s)'),
+                    ('RowsPerSec', 'Rows/s'), ('Error', 'Error')
+                ]
+            ],
+            page_size=20,
+            style_cell={'textAlign': 'center', 'padding': '8px'},
+            style_header={
+                'backgroundColor': 'rgb(230, 230, 230)',
+                'fontWeight': 'bold',
+                'textAlign': 'center'
+            },
+            style_data_conditional=[
+                {
+                    'if': {'filter_query': '{Error} != ""', 'column_id': 'Error'},
+                    'color': 'red'
+                }
+            ]
+        )
+    ], style={'padding': '20px'})
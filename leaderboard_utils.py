@@ -1,10 +1,90 @@
-import sqlite3
+import threading
 import pandas as pd
-from config import HITTRAX_CONFIG
+from datetime import date
+from itertools import groupby
+from connection_pool import get_read_connection, read_pool
+from range_index import RangeIndex
+
+# Graduation years that get a leaderboard
+GRAD_YEARS = range(2025, 2035)
+
+# Per-player daily totals from the PlayerDaily rollup. Accounts with the same
+# name, school, birth date and graduation years count as one player.
+# EffectiveGradYear is resolved at sync time (db/grad_years.py).
+PLAYER_DAYS_QUERY = f"""
+    SELECT 
+        u.FirstName || ' ' || u.LastName as Name,
+        u.School,
+        u.BirthDate,
+        u.GraduationYear,
+        u.EffectiveGradYear as GradYear,
+        d.Day,
+        SUM(d.AB) as AB,
+        SUM(d.HomeRuns) as HomeRuns,
+        SUM(d.ABxAvgExitVelMph) as ABxAvgExitVelMph,
+        SUM(d.ABxAvgDistanceFeet) as ABxAvgDistanceFeet,
+        SUM(d.ABxAVG) as ABxAVG,
+        SUM(d.ABxSLG) as ABxSLG,
+        MAX(d.MaxExitVelMph) as MaxExitVelMph,
+        MAX(d.MaxDistanceFeet) as MaxDistanceFeet
+    FROM UsersConverted u
+    JOIN PlayerDaily d ON u.Id = d.UserId
+    WHERE u.EffectiveGradYear BETWEEN {GRAD_YEARS[0]} AND {GRAD_YEARS[-1]}
+    GROUP BY u.FirstName, u.LastName, u.School, u.BirthDate, u.GraduationYear, u.EffectiveGradYear, d.Day
+    ORDER BY Name, u.School, u.BirthDate, u.GraduationYear, u.EffectiveGradYear, d.Day
+"""
+
+PLAYER_KEY = ['Name', 'School', 'BirthDate', 'GraduationYear', 'GradYear']
+RANGE_SUMS = ['AB', 'HomeRuns', 'ABxAvgExitVelMph', 'ABxAvgDistanceFeet', 'ABxAVG', 'ABxSLG']
+RANGE_MAXIMA = ['MaxExitVelMph', 'MaxDistanceFeet']
+
+# Range indexes of the last build, keyed by the read_pool data generation they were built at
+_player_index = {'generation': None, 'players': []}
+_player_index_lock = threading.Lock()
 
 def get_db_connection():
-    """Create a connection to the SQLite database"""
-    return sqlite3.connect(HITTRAX_CONFIG['sqlite_db'])
+    """This thread's pooled, read-only connection to the SQLite database (see connection_pool.py)"""
+    return get_read_connection()
+
+def build_player_index(conn):
+    """Build a RangeIndex over each player's days from PlayerDaily"""
+    cursor = conn.execute(PLAYER_DAYS_QUERY)
+    columns = [col[0] for col in cursor.description]
+    players = []
+    for _, days in groupby((dict(zip(columns, row)) for row in cursor),
+                           key=lambda day: tuple(day[column] for column in PLAYER_KEY)):
+        days = list(days)
+        index = RangeIndex(
+            [day['Day'] for day in days],
+            {column: [day[column] for day in days] for column in RANGE_SUMS},
+            {column: [day[column] for day in days] for column in RANGE_MAXIMA}
+        )
+        players.append((days[0], index))
+    return players
+
+def get_player_index(conn):
+    """
+    Per-player range indexes, rebuilt only after the database has changed
+
+    The connection pool's data generation (PRAGMA data_version) moves on
+    any commit: syncs, grad year overrides, archives and restores alike.
+    Requests arriving during a rebuild wait for it instead of starting
+    their own.
+    """
+    with _player_index_lock:
+        generation = read_pool.generation(conn)
+        if _player_index['generation'] != generation:
+            _player_index['players'] = build_player_index(conn)
+            _player_index['generation'] = generation
+        return _player_index['players']
+
+def default_start_date():
+    """Same day one year ago"""
+    today = date.today()
+    try:
+        return today.replace(year=today.year - 1)
+    except ValueError:
+        return today.replace(year=today.year - 1, day=28)
 
 def get_leaderboard_data(start_date=None, end_date=None, min_ab=50):
     """Get leaderboard data for each metric by graduation year"""
@@ -14,105 +94,39 @@ def get_leaderboard_data(start_date=None, end_date=None, min_ab=50):
         # Debug print to verify connection
         print("Database connection established")
         
-        query = """
-        WITH PlayerStats AS (
-            SELECT 
-                u.FirstName || ' ' || u.LastName as Name,
-                u.School,
-                u.BirthDate,
-                CASE 
-                    WHEN u.FirstName || ' ' || u.LastName = 'Brody Armstrong' THEN 2029
-                    WHEN u.GraduationYear IS NOT NULL AND u.GraduationYear != 1 THEN u.GraduationYear
-                    WHEN u.FirstName || ' ' || u.LastName = 'Colton Floyd' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Maddox Gonzales' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Kaiden Nerhood' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Wyatt Tinker' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Dean Ellison' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Aiden Mobley' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Everett Burdett' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Luke Feist' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Chase Qualler' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Edward Blanshine' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Damon Saavedra' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Abram Pine' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Noah Segura' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Hunter Easton' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Chris Moya' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Nathaniel Jaramillo' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Mark Scime' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Deegan Goldberg' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Ty Rector' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Avery Dearholt' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Chris Moya' THEN 2026
-                    WHEN u.FirstName || ' ' || u.LastName = 'Landyn Cottone' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Caiden House' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Tas Lupo' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Logan Sunstrom' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Brayden Bustillos' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Chase Rivera' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Matthew Cook' THEN 2027
-                    WHEN u.FirstName || ' ' || u.LastName = 'Richie Reiffenberger' THEN 2028
-                    WHEN u.FirstName || ' ' || u.LastName = 'Brayden Palmerton' THEN 2028
-                    WHEN u.FirstName || ' ' || u.LastName = 'Drew Jones' THEN 2029
-                    WHEN u.FirstName || ' ' || u.LastName = 'James Tabbert' THEN 2029
-                    WHEN u.FirstName || ' ' || u.LastName = 'Gavin Eaton' THEN 2029
-                    WHEN u.FirstName || ' ' || u.LastName = 'Tyler Worthen' THEN 2029
-                    WHEN u.FirstName || ' ' || u.LastName = 'Calin Rivera' THEN 2029
-                    WHEN u.FirstName || ' ' || u.LastName = 'Aiden Koester' THEN 2030
-                    WHEN u.FirstName || ' ' || u.LastName = 'Aaron Flores' THEN 2030
-                    WHEN u.FirstName || ' ' || u.LastName = 'Brody Armstrong' THEN 2030
-                    WHEN u.FirstName || ' ' || u.LastName = 'Adam Jimenez' THEN 2023
-                    WHEN u.FirstName || ' ' || u.LastName = 'Jace Gabaldon' THEN 2028
-                    WHEN u.FirstName || ' ' || u.LastName = 'Radley Philipbar' THEN 2028
-                    WHEN strftime('%m', u.BirthDate) >= '09' 
-                    THEN cast(strftime('%Y', u.BirthDate) as integer) + 18 
-                    ELSE cast(strftime('%Y', u.BirthDate) as integer) + 17 
-                END as GradYear,
-                MAX(s.MaxExitVelMph) as MaxExitVelo,
-                AVG(s.AvgExitVelMph) as AvgExitVelo,
-                MAX(s.MaxDistanceFeet) as MaxDistance,
-                AVG(s.AvgDistanceFeet) as AvgDistance,
-                SUM(s.AB) as TotalAB,
-                AVG(s.AVG) as BattingAvg,
-                AVG(s.SLG) as SlugPct,
-                SUM(s.HomeRuns) as HomeRuns
-            FROM UsersConverted u
-            JOIN SessionConverted s ON u.Id = s.UserId
-            WHERE s.TimeStamp BETWEEN COALESCE(?, date('now', '-1 year')) AND COALESCE(?, date('now'))
-                AND s.Active = 1
-            GROUP BY u.FirstName, u.LastName, u.School, u.BirthDate, u.GraduationYear
-            HAVING SUM(s.AB) >= ?
-        )
-        SELECT 
-            Name,
-            School,
-            GradYear,
-            MaxExitVelo,
-            AvgExitVelo,
-            MaxDistance,
-            AvgDistance,
-            TotalAB,
-            BattingAvg,
-            SlugPct,
-            HomeRuns,
-            ROW_NUMBER() OVER (PARTITION BY GradYear ORDER BY MaxExitVelo DESC) as MaxExitVeloRank,
-            ROW_NUMBER() OVER (PARTITION BY GradYear ORDER BY AvgExitVelo DESC) as AvgExitVeloRank,
-            ROW_NUMBER() OVER (PARTITION BY GradYear ORDER BY MaxDistance DESC) as MaxDistanceRank,
-            ROW_NUMBER() OVER (PARTITION BY GradYear ORDER BY AvgDistance DESC) as AvgDistanceRank
-        FROM PlayerStats
-        WHERE GradYear BETWEEN 2025 AND 2034
-        ORDER BY GradYear, MaxExitVeloRank, AvgExitVeloRank, MaxDistanceRank, AvgDistanceRank
-        """
-        
-        # Debug print before executing query
-        print("Executing query...")
+        start = (start_date or default_start_date().isoformat())[:10]
+        end = (end_date or date.today().isoformat())[:10]
         
-        df = pd.read_sql(query, conn, params=(start_date, end_date, min_ab))
+        # Each player's window totals come from their range index: two
+        # binary searches and a segment tree walk instead of a session scan
+        rows = []
+        for player, index in get_player_index(conn):
+            totals = index.query(start, end)
+            if not totals or totals['AB'] < min_ab:
+                continue
+            at_bats = totals['AB']
+            rows.append({
+                'Name': player['Name'],
+                'School': player['School'],
+                'GradYear': player['GradYear'],
+                'MaxExitVelo': totals['MaxExitVelMph'],
+                'AvgExitVelo': totals['ABxAvgExitVelMph'] / at_bats if at_bats else None,
+                'MaxDistance': totals['MaxDistanceFeet'],
+                'AvgDistance': totals['ABxAvgDistanceFeet'] / at_bats if at_bats else None,
+                'TotalAB': int(at_bats),
+                'BattingAvg': totals['ABxAVG'] / at_bats if at_bats else None,
+                'SlugPct': totals['ABxSLG'] / at_bats if at_bats else None,
+                'HomeRuns': int(totals['HomeRuns'])
+            })
         
-        # Debug print after query execution
-        print(f"Query returned {len(df)} rows")
+        df = pd.DataFrame(rows, columns=['Name', 'School', 'GradYear', 'MaxExitVelo', 'AvgExitVelo',
+                                         'MaxDistance', 'AvgDistance', 'TotalAB', 'BattingAvg',
+                                         'SlugPct', 'HomeRuns'])
+        for field in ['MaxExitVelo', 'AvgExitVelo', 'MaxDistance', 'AvgDistance']:
+            df[f'{field}Rank'] = df.groupby('GradYear')[field].rank(method='first', ascending=False)
         
-        conn.close()
+        # Debug print after building the leaderboard
+        print(f"Leaderboard has {len(df)} qualified players")
         
         metrics = {
             'max-exit-velocity': {'field': 'MaxExitVelo', 'rank': 'MaxExitVeloRank', 'unit': 'mph'},
@@ -123,9 +137,9 @@ def get_leaderboard_data(start_date=None, end_date=None, min_ab=50):
         
         result = {}
         for metric_key, config in metrics.items():
-            result[metric_key] = {year: [] for year in range(2025, 2035)}
+            result[metric_key] = {year: [] for year in GRAD_YEARS}
             
-            for year in range(2025, 2035):
+            for year in GRAD_YEARS:
                 year_df = df[df['GradYear'] == year].copy()
                 top_5 = year_df[year_df[config['rank']] <= 5].sort_values(config['rank'])
                 
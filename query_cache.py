@@ -0,0 +1,101 @@
+# query_cache.py
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+from config import QUERY_CACHE_CONFIG
+from connection_pool import get_read_connection, read_pool
+
+def result_bytes(value):
+    """Approximate memory held by a cached result"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(sys.getsizeof(row) for row in value)
+    return sys.getsizeof(value)
+
+class QueryCache:
+    """
+    Results of read queries, keyed by (kind, query, params) and valid for one data generation
+
+    The generation comes from the connection pool (PRAGMA data_version), so
+    any commit to the database, e.g. by a sync, retires every entry. Entries
+    are evicted least recently used once their estimated size passes
+    max_bytes. Safe to use from several threads.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or QUERY_CACHE_CONFIG['max_bytes']
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, generation, compute):
+        """Return the cached value for key, or compute, store and return it"""
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self.bytes = 0
+                self._generation = generation
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Computed outside the lock so a slow query doesn't block cache hits
+        value = compute()
+        size = result_bytes(value)
+        with self._lock:
+            if generation == self._generation and size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.bytes -= evicted
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None
+            }
+
+query_cache = QueryCache()
+
+def cached_read_sql(query, params=(), transform=None):
+    """
+    pd.read_sql on the pooled connection, answered from the cache while the
+    data hasn't changed. transform (e.g. db_utils.compact_frame) is applied
+    once, before the frame is cached. Returns a copy, so callers may modify it.
+    """
+    conn = get_read_connection()
+    params = tuple(params)
+
+    def load():
+        df = pd.read_sql(query, conn, params=params)
+        return transform(df) if transform else df
+
+    df = query_cache.get(('read_sql', query, params, transform), read_pool.generation(conn), load)
+    return df.copy()
+
+def cached_fetchall(query, params=()):
+    """cursor.fetchall() on the pooled connection, answered from the cache while the data hasn't changed"""
+    conn = get_read_connection()
+    params = tuple(params)
+    return list(query_cache.get(('fetchall', query, params), read_pool.generation(conn),
+                                lambda: conn.execute(query, params).fetchall()))
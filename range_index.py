@@ -0,0 +1,62 @@
+# range_index.py
+from array import array
+from bisect import bisect_left, bisect_right
+
+class RangeIndex:
+    """
+    Sums and maxima over any key range of one sorted series
+
+    Built once from per-day values: additive columns become prefix sums and
+    max columns become segment trees, so a window costs two binary searches
+    plus O(log n) per max column instead of a scan over the days.
+    """
+
+    def __init__(self, keys, sums, maxima):
+        self.keys = keys
+        self.size = len(keys)
+        self.prefix = {}
+        for name, values in sums.items():
+            prefix = array('d', [0.0]) * (self.size + 1)
+            for i, value in enumerate(values):
+                prefix[i + 1] = prefix[i] + (value or 0.0)
+            self.prefix[name] = prefix
+        self.trees = {}
+        for name, values in maxima.items():
+            tree = array('d', [float('-inf')]) * (2 * self.size)
+            for i, value in enumerate(values):
+                tree[self.size + i] = value if value is not None else float('-inf')
+            for i in range(self.size - 1, 0, -1):
+                tree[i] = max(tree[2 * i], tree[2 * i + 1])
+            self.trees[name] = tree
+
+    def window(self, start, end):
+        """Positions [i, j) of the keys between start and end inclusive"""
+        return bisect_left(self.keys, start), bisect_right(self.keys, end)
+
+    def range_sum(self, name, i, j):
+        return self.prefix[name][j] - self.prefix[name][i]
+
+    def range_max(self, name, i, j):
+        tree = self.trees[name]
+        best = float('-inf')
+        i += self.size
+        j += self.size
+        while i < j:
+            if i & 1:
+                best = max(best, tree[i])
+                i += 1
+            if j & 1:
+                j -= 1
+                best = max(best, tree[j])
+            i >>= 1
+            j >>= 1
+        return best if best != float('-inf') else None
+
+    def query(self, start, end):
+        """All sums and maxima between start and end inclusive, or None if no keys fall inside"""
+        i, j = self.window(start, end)
+        if i >= j:
+            return None
+        result = {name: self.range_sum(name, i, j) for name in self.prefix}
+        result.update({name: self.range_max(name, i, j) for name in self.trees})
+        return result
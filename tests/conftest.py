@@ -0,0 +1,39 @@
+# conftest.py
+import sys
+from pathlib import Path
+import pytest
+
+# The db/ scripts import each other (and db/config.py) by plain module name,
+# as they do when run from that directory; dashboard modules live at the root
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / 'db'):
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+    sys.path.insert(0, str(path))
+
+from config import DB_CONFIG, HITTRAX_CONFIG
+from generate_data import generate_source
+
+@pytest.fixture(scope='session')
+def source_template(tmp_path_factory):
+    """A small generated HitTrax source, built once per test run"""
+    path = tmp_path_factory.mktemp('source') / 'source.db'
+    generate_source(str(path), users=20, sessions=400, plays=8000, seed=7)
+    return path
+
+@pytest.fixture
+def source_db(source_template, tmp_path, monkeypatch):
+    """A private copy of the generated source that syncs read from, and a local database path"""
+    path = tmp_path / 'source.db'
+    path.write_bytes(source_template.read_bytes())
+    monkeypatch.setitem(DB_CONFIG, 'fake_source', str(path))
+    monkeypatch.setitem(DB_CONFIG, 'maintenance_after_sync', False)
+    monkeypatch.setitem(HITTRAX_CONFIG, 'sqlite_db', str(tmp_path / 'hittrax_local.db'))
+    return path
+
+@pytest.fixture
+def synced_db(source_db):
+    """The local database after a full sync from source_db"""
+    from sync import sync_all
+    sync_all(raise_errors=True)
+    return HITTRAX_CONFIG['sqlite_db']
@@ -0,0 +1,12 @@
+# test_query_plans.py
+from query_plans import check_query_plans, connect_readonly
+
+def test_hot_queries_use_their_indexes_on_a_fresh_schema():
+    assert check_query_plans(verbose=False) == []
+
+def test_hot_queries_use_their_indexes_on_a_synced_database(synced_db):
+    conn = connect_readonly(synced_db)
+    try:
+        assert check_query_plans(conn, verbose=False) == []
+    finally:
+        conn.close()
@@ -0,0 +1,53 @@
+# test_range_index.py
+import random
+import pytest
+from range_index import RangeIndex
+
+def brute_force(days, start, end):
+    """What RangeIndex.query should return, by scanning the days"""
+    inside = [day for day in days if start <= day['Day'] <= end]
+    if not inside:
+        return None
+    maxima = [day['MaxExitVelMph'] for day in inside if day['MaxExitVelMph'] is not None]
+    return {
+        'AB': sum(day['AB'] for day in inside),
+        'ABxAVG': sum(day['ABxAVG'] or 0.0 for day in inside),
+        'MaxExitVelMph': max(maxima) if maxima else None
+    }
+
+def build(days):
+    return RangeIndex(
+        [day['Day'] for day in days],
+        {name: [day[name] for day in days] for name in ('AB', 'ABxAVG')},
+        {'MaxExitVelMph': [day['MaxExitVelMph'] for day in days]}
+    )
+
+@pytest.mark.parametrize('size', [1, 2, 7, 64, 100])
+def test_every_window_matches_a_scan(size):
+    rng = random.Random(size)
+    days = [{
+        'Day': f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}",
+        'AB': rng.randint(0, 40),
+        'ABxAVG': rng.choice([None, rng.uniform(0, 20)]),
+        'MaxExitVelMph': rng.choice([None, round(rng.uniform(40, 100), 1)])
+    } for i in range(size)]
+    index = build(days)
+    bounds = ['2023-12-31'] + [day['Day'] for day in days] + ['2024-06-15', '2025-01-01']
+    for start in bounds:
+        for end in bounds:
+            expected = brute_force(days, start, end)
+            result = index.query(start, end)
+            if expected is None:
+                assert result is None
+                continue
+            assert result['AB'] == expected['AB']
+            assert result['ABxAVG'] == pytest.approx(expected['ABxAVG'])
+            assert result['MaxExitVelMph'] == expected['MaxExitVelMph']
+
+def test_window_between_days_is_empty():
+    index = build([
+        {'Day': '2024-01-01', 'AB': 5, 'ABxAVG': 1.5, 'MaxExitVelMph': 80.0},
+        {'Day': '2024-01-05', 'AB': 3, 'ABxAVG': 0.9, 'MaxExitVelMph': 85.0}
+    ])
+    assert index.query('2024-01-02', '2024-01-04') is None
+    assert index.query('2024-01-05', '2024-01-01') is None